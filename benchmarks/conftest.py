@@ -0,0 +1,135 @@
+import io
+import json
+import os
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+
+# Параметры fill_db для каждого масштаба: пользователи, сборы
+# на пользователя и максимум платежей на сбор. В среднем сбор
+# набирает около десяти платежей до целевой суммы.
+SCALES = {
+    '1k': {'users': 10, 'collects': 10, 'payments': 20},
+    '100k': {'users': 100, 'collects': 100, 'payments': 20},
+    '1m': {'users': 1000, 'collects': 100, 'payments': 20},
+}
+
+# Результаты замеров текущего запуска: {эндпоинт: метрики}.
+RESULTS = {}
+# Пропускная способность под ASGI: {эндпоинт: запросов в секунду
+# синхронного и асинхронного представлений}.
+THROUGHPUT = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks')
+    group.addoption(
+        '--scale',
+        choices=list(SCALES),
+        default='1k',
+        help='Объем тестовых данных для замеров',
+    )
+    group.addoption(
+        '--rounds',
+        type=int,
+        default=30,
+        help='Количество запросов к эндпоинту для расчета p50/p95',
+    )
+    group.addoption(
+        '--tolerance',
+        type=float,
+        default=0.5,
+        help='Допустимый относительный рост p95 по сравнению с базой',
+    )
+    group.addoption(
+        '--check-latency',
+        action='store_true',
+        default=os.getenv('BENCHMARK_CHECK_LATENCY', '').lower() == 'true',
+        help=(
+            'Сравнивать p95 с baseline.json. База снята на одной машине, '
+            'поэтому проверка включается только там же '
+            '(или BENCHMARK_CHECK_LATENCY=true)'
+        ),
+    )
+    group.addoption(
+        '--concurrency',
+        type=int,
+        default=16,
+        help='Количество одновременных клиентов в замерах под ASGI',
+    )
+    group.addoption(
+        '--update-baseline',
+        action='store_true',
+        help='Записать результаты запуска в baseline.json',
+    )
+
+
+def load_baseline(scale):
+    """Сохраненные метрики для масштаба или пустой словарь."""
+    if not BASELINE_PATH.exists():
+        return {}
+    return json.loads(BASELINE_PATH.read_text()).get(scale, {})
+
+
+def save_baseline(scale, results):
+    """Перезаписывает метрики масштаба в baseline.json."""
+    baseline = {}
+    if BASELINE_PATH.exists():
+        baseline = json.loads(BASELINE_PATH.read_text())
+    baseline[scale] = dict(sorted(results.items()))
+    BASELINE_PATH.write_text(
+        json.dumps(baseline, indent=2, sort_keys=True) + '\n'
+    )
+
+
+@pytest.fixture(scope='session')
+def scale(pytestconfig):
+    return pytestconfig.getoption('scale')
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker, scale):
+    """Наполняет тестовую базу один раз на весь запуск замеров."""
+    with django_db_blocker.unblock():
+        call_command('fill_db', seed=0, stdout=io.StringIO(), **SCALES[scale])
+
+
+@pytest.fixture(scope='session')
+def baseline(pytestconfig, scale):
+    """
+    Базовые метрики масштаба.
+    С --update-baseline результаты запуска записываются в файл.
+    """
+    yield load_baseline(scale)
+    if pytestconfig.getoption('update_baseline') and RESULTS:
+        save_baseline(scale, RESULTS)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if THROUGHPUT:
+        terminalreporter.section(
+            f'asgi throughput ({config.getoption("concurrency")} clients)'
+        )
+        terminalreporter.write_line(
+            f'{"endpoint":<24}{"sync, rps":>12}{"async, rps":>12}'
+        )
+        for name, metrics in sorted(THROUGHPUT.items()):
+            terminalreporter.write_line(
+                f'{name:<24}{metrics["sync_rps"]:>12.0f}'
+                f'{metrics["async_rps"]:>12.0f}'
+            )
+    if not RESULTS:
+        return
+    terminalreporter.section(f'benchmarks ({config.getoption("scale")})')
+    terminalreporter.write_line(
+        f'{"endpoint":<24}{"queries":>8}{"p50, ms":>10}{"p95, ms":>10}'
+    )
+    for name, metrics in sorted(RESULTS.items()):
+        terminalreporter.write_line(
+            f'{name:<24}{metrics["queries"]:>8}'
+            f'{metrics["p50_ms"]:>10.2f}{metrics["p95_ms"]:>10.2f}'
+        )
@@ -0,0 +1,235 @@
+import gc
+import statistics
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from benchmarks.conftest import RESULTS
+from collects.models import Collect
+
+User = get_user_model()
+
+# Размеры страницы или пачки, между которыми число запросов
+# к БД не должно меняться.
+SIZES = (1, 50)
+# Абсолютный запас для p95: на запросах в единицы миллисекунд
+# относительный допуск меньше шума измерений.
+LATENCY_NOISE_MS = 5
+# Слово, которого нет в данных fill_db: поиск находит только сборы bench.
+SEARCH_WORD = 'пончиковый'
+
+
+def _client(user=None):
+    client = APIClient()
+    if user is not None:
+        client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def bench(db):
+    """Клиенты и объекты, к которым обращаются замеры."""
+    user = User.objects.order_by('pk').first()
+    admin = baker.make(User, username='bench_admin', is_staff=True)
+    return SimpleNamespace(
+        anon=_client(),
+        user=_client(user),
+        admin=_client(admin),
+        collect=Collect.objects.order_by('-payments_count', 'pk').first(),
+        open_collect=baker.make(
+            'collects.Collect',
+            author=user,
+            target_amount=None,
+            end_datetime=timezone.now() + timedelta(days=30),
+        ),
+        searchable=baker.make(
+            'collects.Collect',
+            author=user,
+            title=f'{SEARCH_WORD} марафон',
+            _quantity=60,
+        ),
+    )
+
+
+def collect_list(bench, size=20):
+    return bench.anon.get('/api/v1/collects/', {'page_size': size})
+
+
+def collect_detail(bench, size=None):
+    return bench.anon.get(f'/api/v1/collects/{bench.collect.pk}/')
+
+
+def collect_search(bench, size=20):
+    return bench.anon.get(
+        '/api/v1/collects/', {'search': SEARCH_WORD, 'page_size': size}
+    )
+
+
+def collect_payments(bench, size=20):
+    return bench.anon.get(
+        f'/api/v1/collects/{bench.collect.pk}/payments/',
+        {'page_size': size},
+    )
+
+
+def collect_leaderboard(bench, size=10):
+    return bench.anon.get(
+        f'/api/v1/collects/{bench.collect.pk}/leaderboard/',
+        {'limit': size},
+    )
+
+
+def collect_stats(bench, size=None):
+    return bench.anon.get('/api/v1/collects/stats/')
+
+
+def collect_export(bench, size=None):
+    return bench.admin.get('/api/v1/collects/export/')
+
+
+def payment_list(bench, size=20):
+    return bench.user.get('/api/v1/payments/', {'page_size': size})
+
+
+def payment_list_by_collect(bench, size=20):
+    return bench.user.get(
+        '/api/v1/payments/',
+        {'collect_id': bench.collect.pk, 'page_size': size},
+    )
+
+
+def payment_export(bench, size=None):
+    return bench.admin.get('/api/v1/payments/export/')
+
+
+def payment_create(bench, size=None):
+    return bench.user.post(
+        '/api/v1/payments/',
+        {'collect': bench.open_collect.pk, 'amount': 100},
+        format='json',
+    )
+
+
+def payment_bulk(bench, size=20):
+    return bench.user.post(
+        '/api/v1/payments/bulk/',
+        [{'collect': bench.open_collect.pk, 'amount': 100}] * size,
+        format='json',
+    )
+
+
+ENDPOINTS = {
+    'collect-list': collect_list,
+    'collect-search': collect_search,
+    'collect-detail': collect_detail,
+    'collect-payments': collect_payments,
+    'collect-leaderboard': collect_leaderboard,
+    'collect-stats': collect_stats,
+    'collect-export': collect_export,
+    'payment-list': payment_list,
+    'payment-list-by-collect': payment_list_by_collect,
+    'payment-export': payment_export,
+    'payment-create': payment_create,
+    'payment-bulk': payment_bulk,
+}
+
+# Эндпоинты со страницами или пачками переменного размера.
+SIZED_ENDPOINTS = [
+    'collect-list',
+    'collect-search',
+    'collect-payments',
+    'collect-leaderboard',
+    'payment-list',
+    'payment-list-by-collect',
+    'payment-bulk',
+]
+
+
+def _request(endpoint, bench, **kwargs):
+    """Выполняет запрос и дочитывает потоковый ответ до конца."""
+    response = endpoint(bench, **kwargs)
+    assert response.status_code < 300, response.content
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+def _count_queries(endpoint, bench, **kwargs):
+    with CaptureQueriesContext(connection) as context:
+        _request(endpoint, bench, **kwargs)
+    return len(context.captured_queries)
+
+
+@pytest.mark.parametrize('name', SIZED_ENDPOINTS)
+def test_query_count_does_not_grow_with_size(name, bench):
+    """Число запросов к БД не зависит от размера страницы или пачки."""
+    endpoint = ENDPOINTS[name]
+    # Прогрев: первый платеж донатера в сбор создает запись реестра.
+    _request(endpoint, bench)
+    small, large = (
+        _count_queries(endpoint, bench, size=size) for size in SIZES
+    )
+    assert small == large, (
+        f'{name}: {small} запросов при размере {SIZES[0]}, '
+        f'{large} при размере {SIZES[-1]}'
+    )
+
+
+@pytest.mark.parametrize('name', list(ENDPOINTS))
+def test_endpoint_does_not_regress(name, bench, baseline, pytestconfig):
+    """
+    Число запросов не больше сохраненного в baseline.json.
+    p95 сравнивается с базой только с --check-latency: абсолютное
+    время зависит от машины, на которой база снята.
+    """
+    endpoint = ENDPOINTS[name]
+    # Прогрев: первый запрос заполняет кэши Django и DRF.
+    _request(endpoint, bench)
+    queries = _count_queries(endpoint, bench)
+
+    timings = []
+    # Как timeit: сборка мусора, накопленного предыдущими замерами,
+    # не попадает в время отдельных запросов.
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(pytestconfig.getoption('rounds')):
+            started = time.perf_counter()
+            _request(endpoint, bench)
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        gc.enable()
+    percentiles = statistics.quantiles(timings, n=20)
+    metrics = {
+        'queries': queries,
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(percentiles[18], 2),
+    }
+    RESULTS[name] = metrics
+
+    expected = baseline.get(name)
+    if expected is None or pytestconfig.getoption('update_baseline'):
+        return
+    assert metrics['queries'] <= expected['queries'], (
+        f'{name}: {metrics["queries"]} запросов, '
+        f'в базе {expected["queries"]}'
+    )
+    if not pytestconfig.getoption('check_latency'):
+        return
+    tolerance = pytestconfig.getoption('tolerance')
+    allowed_p95 = max(
+        expected['p95_ms'] * (1 + tolerance),
+        expected['p95_ms'] + LATENCY_NOISE_MS,
+    )
+    assert metrics['p95_ms'] <= allowed_p95, (
+        f'{name}: p95 {metrics["p95_ms"]} мс, '
+        f'допустимо {allowed_p95:.2f} мс'
+    )
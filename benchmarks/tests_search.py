@@ -0,0 +1,78 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from benchmarks.tests_endpoints import SEARCH_WORD
+from collects.models import Collect
+
+User = get_user_model()
+
+# Во сколько раз (но не меньше MIN_ROWS строк) растет таблица сборов
+# и насколько при этом может замедлиться поиск: полный просмотр
+# замедлился бы пропорционально.
+GROWTH = 20
+MIN_ROWS = 20000
+MAX_ROWS = 200000
+MAX_SLOWDOWN = 3
+
+
+def _p50(request, rounds):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        response = request()
+        timings.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.content
+    return statistics.median(timings) * 1000
+
+
+def test_search_scales_sublinearly(db, pytestconfig):
+    """
+    Время поиска по индексу почти не зависит от числа сборов:
+    после роста таблицы в GROWTH раз p50 растет меньше MAX_SLOWDOWN.
+    """
+    user = User.objects.order_by('pk').first()
+    baker.make(
+        'collects.Collect', author=user, title=f'{SEARCH_WORD} марафон',
+        _quantity=20,
+    )
+    client = APIClient()
+    rounds = pytestconfig.getoption('rounds')
+
+    def search():
+        return client.get('/api/v1/collects/', {'search': SEARCH_WORD})
+
+    search()
+    small_rows = Collect.objects.count()
+    small_p50 = _p50(search, rounds)
+
+    # Новые сборы с текстами из данных fill_db, без искомого слова.
+    templates = list(
+        Collect.objects.exclude(title__contains=SEARCH_WORD)[:100]
+    )
+    extra_rows = min(max(small_rows * (GROWTH - 1), MIN_ROWS), MAX_ROWS)
+    Collect.objects.bulk_create(
+        [
+            Collect(
+                author=user,
+                title=template.title,
+                description=template.description,
+                occasion=template.occasion,
+                end_datetime=template.end_datetime,
+            )
+            for template in (
+                templates[index % len(templates)]
+                for index in range(extra_rows)
+            )
+        ],
+        batch_size=1000,
+    )
+    large_p50 = _p50(search, rounds)
+
+    assert large_p50 <= small_p50 * MAX_SLOWDOWN, (
+        f'поиск: p50 {small_p50:.2f} мс на {small_rows} сборах, '
+        f'{large_p50:.2f} мс на {small_rows + extra_rows}'
+    )
@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.conftest import THROUGHPUT
+from collects.models import Collect
+from config.asgi import application
+
+
+async def _get(path, query=''):
+    """GET-запрос к ASGI-приложению в процессе, без сокетов."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'root_path': '',
+        'query_string': query.encode(),
+        'headers': [(b'host', b'testserver')],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 0),
+    }
+    disconnect = asyncio.Event()
+    messages = []
+
+    async def receive():
+        if not messages:
+            messages.append(None)
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Клиент не отключается, пока приложение не ответит.
+        await disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    start = next(
+        message for message in messages[1:]
+        if message['type'] == 'http.response.start'
+    )
+    assert start['status'] == 200, (path, start['status'])
+
+
+async def _load(path, query, concurrency, rounds):
+    """
+    concurrency клиентов отправляют по rounds запросов подряд.
+    Возвращает число запросов в секунду.
+    """
+    async def client():
+        for _ in range(rounds):
+            await _get(path, query)
+
+    # Прогрев: первый запрос заполняет кэши Django и DRF.
+    await _get(path, query)
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return concurrency * rounds / (time.perf_counter() - started)
+
+
+@pytest.mark.parametrize('name, sync_path, async_path, query', [
+    (
+        'collect-list',
+        '/api/v1/collects/',
+        '/api/v1/async/collects/',
+        'page_size=20',
+    ),
+    (
+        'collect-detail',
+        '/api/v1/collects/{pk}/',
+        '/api/v1/async/collects/{pk}/',
+        '',
+    ),
+])
+def test_async_throughput_not_worse_than_sync(
+    name, sync_path, async_path, query, db, pytestconfig
+):
+    """
+    Пропускная способность асинхронного представления под конкурентной
+    нагрузкой через config.asgi.application не ниже, чем
+    у CollectViewSet, с допуском --tolerance.
+    """
+    pk = Collect.objects.order_by('-payments_count', 'pk').first().pk
+    load = {
+        'concurrency': pytestconfig.getoption('concurrency'),
+        'rounds': pytestconfig.getoption('rounds'),
+    }
+    sync_rps = asyncio.run(_load(sync_path.format(pk=pk), query, **load))
+    async_rps = asyncio.run(_load(async_path.format(pk=pk), query, **load))
+    THROUGHPUT[name] = {'sync_rps': sync_rps, 'async_rps': async_rps}
+
+    tolerance = pytestconfig.getoption('tolerance')
+    assert async_rps >= sync_rps * (1 - tolerance), (
+        f'{name}: async {async_rps:.0f} запросов/с, '
+        f'sync {sync_rps:.0f} запросов/с'
+    )
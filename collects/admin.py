@@ -1,29 +1,33 @@
 from django.contrib import admin
 
 from collects.models import Collect
+from config.admin import LargeTableAdminMixin
 
 
 @admin.register(Collect)
-class CollectAdmin(admin.ModelAdmin):
+class CollectAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = (
         'title', 'author', 'occasion', 'current_amount',
         'target_amount', 'end_datetime', 'created_at', 'is_completed'
     )
-    list_filter = ('occasion', 'created_at', 'end_datetime')
+    list_select_related = ('author',)
+    list_filter = ('occasion', 'is_completed', 'created_at', 'end_datetime')
     search_fields = ('title', 'author__username', 'description')
-    readonly_fields = ('current_amount', 'created_at')
+    autocomplete_fields = ('author',)
+    readonly_fields = (
+        'current_amount', 'donators_count', 'payments_count', 'created_at'
+    )
     fieldsets = (
         ('Основная информация', {
             'fields': ('author', 'title', 'description', 'occasion')
         }),
         ('Финансовая информация', {
-            'fields': ('target_amount', 'current_amount', 'donators_count')
+            'fields': (
+                'target_amount', 'current_amount',
+                'donators_count', 'payments_count'
+            )
         }),
         ('Даты и медиа', {
             'fields': ('end_datetime', 'cover_image', 'created_at')
         }),
     )
-
-    @admin.display(description='Current Amount')
-    def current_amount(self, obj):
-        return obj.current_amount
@@ -1,4 +1,9 @@
+from decimal import Decimal
+
 TITLE_LENGTH_LIMIT = 40
 DESCRIPTION_LENGTH_LIMIT = 200
 AMOUNT_MAX_DIGITS = 12
 AMOUNT_DECIMAL_PLACES = 2
+# Наименьшая сумма платежа: нулевые и отрицательные платежи
+# уменьшали бы итоги сбора.
+MIN_PAYMENT_AMOUNT = Decimal('0.01')
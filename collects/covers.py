@@ -0,0 +1,155 @@
+import io
+import logging
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from collects.models import Collect
+from config.cache_utils import invalidate_collect
+from config.projections import file_url
+
+
+logger = logging.getLogger(__name__)
+
+# Варианты обложки: имя, наибольшая сторона в пикселях и формат.
+COVER_VARIANTS = (
+    ('thumbnail', 320, 'JPEG'),
+    ('thumbnail_webp', 320, 'WEBP'),
+    ('medium', 960, 'JPEG'),
+    ('medium_webp', 960, 'WEBP'),
+)
+COVER_VARIANTS_DIR = 'collect_covers/variants'
+COVER_VARIANT_QUALITY = 82
+
+_EXTENSIONS = {'JPEG': 'jpg', 'WEBP': 'webp'}
+
+
+def _cover_field():
+    return Collect._meta.get_field('cover_image')
+
+
+def cover_needs_processing(collect):
+    """Варианты не построены для текущего файла обложки сбора."""
+    variants = collect.cover_variants or {}
+    return variants.get('source') != (collect.cover_image.name or None)
+
+
+def cover_variant_urls(variants, cover_name, request=None):
+    """
+    Варианты обложки для ответа API: URL и размеры каждого.
+    Пока варианты текущего файла не построены, возвращает None.
+    """
+    if not cover_name or not variants or variants['source'] != cover_name:
+        return None
+    field = _cover_field()
+    return {
+        name: {
+            'url': file_url(field, variant['name'], request),
+            'width': variant['width'],
+            'height': variant['height'],
+        }
+        for name, variant in variants['files'].items()
+    }
+
+
+def _encode(image, size, image_format):
+    """
+    Уменьшенная копия изображения в заданном формате.
+    Метаданные (EXIF, XMP, ICC) в save не передаются и в файл
+    не попадают; поворот из EXIF уже применен к пикселям.
+    """
+    variant = image.copy()
+    variant.thumbnail((size, size), Image.Resampling.LANCZOS)
+    has_alpha = variant.mode in ('RGBA', 'LA') or (
+        variant.mode == 'P' and 'transparency' in variant.info
+    )
+    if image_format == 'JPEG' and has_alpha:
+        # JPEG без прозрачности: подкладываем белый фон.
+        variant = variant.convert('RGBA')
+        background = Image.new('RGB', variant.size, 'white')
+        background.paste(variant, mask=variant)
+        variant = background
+    else:
+        variant = variant.convert('RGBA' if has_alpha else 'RGB')
+
+    buffer = io.BytesIO()
+    options = {'quality': COVER_VARIANT_QUALITY}
+    if image_format == 'JPEG':
+        options.update(optimize=True, progressive=True)
+    variant.save(buffer, image_format, **options)
+    return buffer.getvalue(), variant.size
+
+
+def build_cover_variants(collect_id, cover_name):
+    """
+    Строит и сохраняет в хранилище варианты файла обложки.
+    Возвращает значение для Collect.cover_variants.
+    """
+    field = _cover_field()
+    stem = PurePosixPath(cover_name).stem
+    largest = max(size for _, size, _ in COVER_VARIANTS)
+    files = {}
+    with field.storage.open(cover_name, 'rb') as source:
+        with Image.open(source) as image:
+            # JPEG декодируется сразу в уменьшенном масштабе.
+            image.draft('RGB', (largest, largest))
+            image = ImageOps.exif_transpose(image)
+            for name, size, image_format in COVER_VARIANTS:
+                content, (width, height) = _encode(image, size, image_format)
+                stored_name = field.storage.save(
+                    f'{COVER_VARIANTS_DIR}/{collect_id}/{stem}-{name}.'
+                    f'{_EXTENSIONS[image_format]}',
+                    ContentFile(content),
+                )
+                files[name] = {
+                    'name': stored_name, 'width': width, 'height': height
+                }
+    return {'source': cover_name, 'files': files}
+
+
+def delete_cover_variants(variants):
+    """Удаляет файлы вариантов обложки из хранилища."""
+    if not variants:
+        return
+    storage = _cover_field().storage
+    for variant in variants['files'].values():
+        storage.delete(variant['name'])
+
+
+def process_cover(collect_id):
+    """
+    Строит варианты текущей обложки сбора и сохраняет их в сборе.
+    Если обложку успели заменить, результат отбрасывается: новую
+    обложку обработает следующая задача. Варианты прежней обложки
+    удаляются. Возвращает True, если варианты сбора изменились.
+    """
+    row = Collect.objects.filter(pk=collect_id).values(
+        'cover_image', 'cover_variants'
+    ).first()
+    if row is None:
+        return False
+    cover_name = row['cover_image'] or None
+    previous = row['cover_variants']
+    if (previous or {}).get('source') == cover_name:
+        return False
+
+    variants = None
+    if cover_name:
+        try:
+            variants = build_cover_variants(collect_id, cover_name)
+        except OSError:
+            logger.exception(
+                'Не удалось обработать обложку сбора %s', collect_id
+            )
+            return False
+
+    updated = Collect.objects.filter(
+        pk=collect_id, cover_image=row['cover_image']
+    ).update(cover_variants=variants)
+    if not updated:
+        delete_cover_variants(variants)
+        return False
+    delete_cover_variants(previous)
+    invalidate_collect(collect_id)
+    return True
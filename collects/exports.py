@@ -0,0 +1,14 @@
+COLLECT_EXPORT_FIELDS = (
+    ('id', 'id'),
+    ('title', 'title'),
+    ('occasion', 'occasion'),
+    ('author_id', 'author_id'),
+    ('author_username', 'author__username'),
+    ('target_amount', 'target_amount'),
+    ('current_amount', 'current_amount'),
+    ('donators_count', 'donators_count'),
+    ('payments_count', 'payments_count'),
+    ('end_datetime', 'end_datetime'),
+    ('created_at', 'created_at'),
+    ('is_completed', 'is_completed'),
+)
@@ -0,0 +1,77 @@
+from collects.models import FUNDING_PROGRESS
+
+
+# Порядок курсорной пагинации для каждой сортировки ленты. Второе поле
+# делает порядок однозначным и совпадает с направлением индекса.
+FEED_ORDERINGS = {
+    'created_at': ('created_at', '-id'),
+    '-created_at': ('-created_at', 'id'),
+    'end_datetime': ('end_datetime', 'id'),
+    '-end_datetime': ('-end_datetime', '-id'),
+    'progress': ('progress', 'id'),
+    '-progress': ('-progress', '-id'),
+}
+
+# Допустимые сочетания фильтров для каждой сортировки. Каждое
+# обслуживается индексом из Collect.Meta.indexes без полного перебора
+# и сортировки; это проверяет тест по плану запроса.
+FEED_FILTERS = {
+    'created_at': (
+        frozenset(),
+        frozenset({'occasion'}),
+        frozenset({'author'}),
+        frozenset({'is_completed'}),
+    ),
+    'end_datetime': (
+        frozenset({'is_completed'}),
+        frozenset({'is_completed', 'end_datetime'}),
+    ),
+    'progress': (
+        frozenset({'is_completed'}),
+    ),
+}
+# Сортировки по частичным индексам активных сборов: они требуют
+# is_completed=false. Составные индексы с is_completed SQLite
+# обновлял бы при каждом платеже: UPDATE итогов присваивает is_completed.
+ACTIVE_ONLY_ORDERINGS = ('end_datetime', 'progress')
+
+
+def feed_filters(params):
+    """Группы фильтров ленты, заданные в параметрах запроса."""
+    groups = set()
+    for name in ('occasion', 'author', 'is_completed'):
+        if params.get(name) is not None:
+            groups.add(name)
+    if params.get('end_after') or params.get('end_before'):
+        groups.add('end_datetime')
+    return frozenset(groups)
+
+
+def apply_feed_filters(queryset, params):
+    """Фильтры ленты из проверенных параметров запроса."""
+    if params.get('occasion') is not None:
+        queryset = queryset.filter(occasion=params['occasion'])
+    if params.get('author') is not None:
+        queryset = queryset.filter(author_id=params['author'])
+    if params.get('is_completed') is not None:
+        queryset = queryset.filter(is_completed=params['is_completed'])
+    if params.get('end_after'):
+        queryset = queryset.filter(end_datetime__gte=params['end_after'])
+    if params.get('end_before'):
+        queryset = queryset.filter(end_datetime__lt=params['end_before'])
+    return queryset
+
+
+def filter_feed(queryset, params):
+    """
+    Применяет к ленте сборов проверенные параметры
+    CollectFeedParamsSerializer. Возвращает queryset и порядок
+    для курсорной пагинации.
+    """
+    queryset = apply_feed_filters(queryset, params)
+    ordering = params['ordering']
+    if ordering.lstrip('-') == 'progress':
+        queryset = queryset.filter(target_amount__isnull=False).annotate(
+            progress=FUNDING_PROGRESS
+        )
+    return queryset, FEED_ORDERINGS[ordering]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_totals(apps, schema_editor):
+    """Заполняет итоги сборов по уже существующим платежам."""
+    Collect = apps.get_model('collects', 'Collect')
+    CollectDonator = apps.get_model('collects', 'CollectDonator')
+    Payment = apps.get_model('payments', 'Payment')
+
+    totals = (
+        Payment.objects.order_by()
+        .values('collect_id')
+        .annotate(
+            amount=Sum('amount'),
+            payments=Count('id'),
+            donators=Count('donator_id', distinct=True),
+        )
+    )
+    for row in totals.iterator():
+        Collect.objects.filter(pk=row['collect_id']).update(
+            current_amount=row['amount'],
+            payments_count=row['payments'],
+            donators_count=row['donators'],
+        )
+
+    entries = (
+        Payment.objects.order_by()
+        .values('collect_id', 'donator_id')
+        .annotate(payments=Count('id'))
+    )
+    CollectDonator.objects.bulk_create(
+        (
+            CollectDonator(
+                collect_id=row['collect_id'],
+                donator_id=row['donator_id'],
+                payments_count=row['payments'],
+            )
+            for row in entries.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collects', '0003_remove_collect_current_amount_and_more'),
+        ('payments', '0002_alter_payment_donator'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='collect',
+            name='current_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12, verbose_name='Собранная сумма'),
+        ),
+        migrations.AddField(
+            model_name='collect',
+            name='donators_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество донатеров'),
+        ),
+        migrations.AddField(
+            model_name='collect',
+            name='payments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество платежей'),
+        ),
+        migrations.CreateModel(
+            name='CollectDonator',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payments_count', models.PositiveIntegerField(default=0, verbose_name='Количество платежей')),
+                ('collect', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='donator_entries', to='collects.collect', verbose_name='Сбор')),
+                ('donator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='collect_entries', to=settings.AUTH_USER_MODEL, verbose_name='Донатер')),
+            ],
+            options={
+                'verbose_name': 'Донатер сбора',
+                'verbose_name_plural': 'Донатеры сборов',
+                'constraints': [models.UniqueConstraint(fields=('collect', 'donator'), name='unique_collect_donator')],
+            },
+        ),
+        migrations.RunPython(fill_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collects', '0004_collect_totals'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='collect',
+            index=models.Index(fields=['-created_at', 'id'], name='collect_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='collect',
+            index=models.Index(fields=['occasion', '-created_at'], name='collect_occasion_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='collect',
+            index=models.Index(condition=models.Q(('is_completed', False)), fields=['end_datetime'], name='collect_active_end_idx'),
+        ),
+    ]
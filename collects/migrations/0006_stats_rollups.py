@@ -0,0 +1,88 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:24
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import TruncDate
+
+
+def fill_stats(apps, schema_editor):
+    """Заполняет суммы донатеров и суточные итоги по платежам."""
+    CollectDonator = apps.get_model('collects', 'CollectDonator')
+    OccasionDailyStats = apps.get_model('collects', 'OccasionDailyStats')
+    Payment = apps.get_model('payments', 'Payment')
+
+    donator_amounts = (
+        Payment.objects.filter(
+            collect_id=OuterRef('collect_id'),
+            donator_id=OuterRef('donator_id'),
+        )
+        .order_by()
+        .values('collect_id', 'donator_id')
+        .annotate(total=Sum('amount'))
+        .values('total')
+    )
+    CollectDonator.objects.update(amount=Subquery(donator_amounts))
+
+    buckets = (
+        Payment.objects.order_by()
+        .annotate(day=TruncDate('payment_datetime'))
+        .values('collect__occasion', 'day')
+        .annotate(amount=Sum('amount'), payments=Count('id'))
+    )
+    OccasionDailyStats.objects.bulk_create(
+        (
+            OccasionDailyStats(
+                occasion=row['collect__occasion'],
+                day=row['day'],
+                amount=row['amount'],
+                payments_count=row['payments'],
+            )
+            for row in buckets.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collects', '0005_query_indexes'),
+        ('payments', '0003_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccasionDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('occasion', models.CharField(choices=[('birthday', 'День рождения'), ('wedding', 'Свадьба'), ('charity', 'Благотворительность'), ('medicine', 'Медицина'), ('education', 'Образование'), ('other', 'Другое')], max_length=20, verbose_name='Повод')),
+                ('day', models.DateField(verbose_name='День')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Сумма платежей')),
+                ('payments_count', models.PositiveIntegerField(default=0, verbose_name='Количество платежей')),
+            ],
+            options={
+                'verbose_name': 'Статистика повода за день',
+                'verbose_name_plural': 'Статистика поводов по дням',
+            },
+        ),
+        migrations.AddField(
+            model_name='collectdonator',
+            name='amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Сумма платежей'),
+        ),
+        migrations.AddIndex(
+            model_name='collectdonator',
+            index=models.Index(fields=['collect', '-amount'], name='collect_donator_amount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='occasiondailystats',
+            index=models.Index(fields=['day'], name='occasion_stats_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='occasiondailystats',
+            constraint=models.UniqueConstraint(fields=('occasion', 'day'), name='unique_occasion_day'),
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collects', '0006_stats_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='collect',
+            name='payments_archived_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Платежи перенесены в архив'),
+        ),
+    ]
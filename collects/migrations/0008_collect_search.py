@@ -0,0 +1,100 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:20
+
+from django.db import migrations
+
+
+POSTGRES_FORWARD = (
+    """
+    ALTER TABLE collects_collect ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('russian', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX collect_search_idx ON collects_collect '
+    'USING gin (search_vector)',
+)
+POSTGRES_BACKWARD = (
+    'DROP INDEX IF EXISTS collect_search_idx',
+    'ALTER TABLE collects_collect DROP COLUMN IF EXISTS search_vector',
+)
+
+SQLITE_FORWARD = (
+    """
+    CREATE VIRTUAL TABLE collects_collect_fts USING fts5(
+        title, description,
+        content='collects_collect', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER collects_collect_fts_insert
+    AFTER INSERT ON collects_collect BEGIN
+        INSERT INTO collects_collect_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER collects_collect_fts_delete
+    AFTER DELETE ON collects_collect BEGIN
+        INSERT INTO collects_collect_fts
+            (collects_collect_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER collects_collect_fts_update
+    AFTER UPDATE OF title, description ON collects_collect BEGIN
+        INSERT INTO collects_collect_fts
+            (collects_collect_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO collects_collect_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO collects_collect_fts (collects_collect_fts) "
+    "VALUES ('rebuild')",
+)
+SQLITE_BACKWARD = (
+    'DROP TRIGGER IF EXISTS collects_collect_fts_update',
+    'DROP TRIGGER IF EXISTS collects_collect_fts_delete',
+    'DROP TRIGGER IF EXISTS collects_collect_fts_insert',
+    'DROP TABLE IF EXISTS collects_collect_fts',
+)
+
+
+def _execute(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Индекс полнотекстового поиска сборов: колонка tsvector с GIN в
+    PostgreSQL или таблица FTS5 с триггерами в SQLite. Обе
+    поддерживаются СУБД при каждом сохранении сбора.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _execute(schema_editor, POSTGRES_FORWARD)
+    elif vendor == 'sqlite':
+        _execute(schema_editor, SQLITE_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _execute(schema_editor, POSTGRES_BACKWARD)
+    elif vendor == 'sqlite':
+        _execute(schema_editor, SQLITE_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collects', '0007_collect_payments_archived_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
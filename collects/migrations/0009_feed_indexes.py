@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:10
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collects', '0008_collect_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='collect',
+            index=models.Index(fields=['author', '-created_at'], name='collect_author_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='collect',
+            index=models.Index(django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast('current_amount', models.FloatField()), '/', django.db.models.functions.comparison.Cast('target_amount', models.FloatField())), models.F('id'), condition=models.Q(('is_completed', False), ('target_amount__isnull', False)), name='collect_active_progress_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collects', '0009_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='collect',
+            name='cover_variants',
+            field=models.JSONField(blank=True, editable=False, null=True, verbose_name='Уменьшенные варианты обложки'),
+        ),
+    ]
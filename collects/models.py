@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Cast
 from django.contrib.auth import get_user_model
 
 from collects.constants import (
@@ -11,6 +12,13 @@ from collects.constants import (
 
 User = get_user_model()
 
+# Доля собранной суммы от цели. Вычисляется в double precision, чтобы
+# в SQLite деление не было целочисленным; то же выражение стоит в
+# индексе collect_active_progress_idx.
+FUNDING_PROGRESS = Cast('current_amount', models.FloatField()) / Cast(
+    'target_amount', models.FloatField()
+)
+
 
 class Collect(models.Model):
     """
@@ -68,15 +76,192 @@ class Collect(models.Model):
         blank=True,
         verbose_name='Обложка сбора',
     )
+    # Заполняется задачей process_cover_image (collects.covers):
+    # исходный файл, имена, ширина и высота вариантов.
+    cover_variants = models.JSONField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные варианты обложки',
+    )
     is_completed = models.BooleanField(
         default=False,
         verbose_name='Сбор завершен',
     )
+    current_amount = models.DecimalField(
+        max_digits=AMOUNT_MAX_DIGITS,
+        decimal_places=AMOUNT_DECIMAL_PLACES,
+        default=0,
+        editable=False,
+        verbose_name='Собранная сумма',
+    )
+    donators_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество донатеров',
+    )
+    payments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество платежей',
+    )
+    payments_archived_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Платежи перенесены в архив',
+    )
+
+    # Поля, которые меняют только условные UPDATE: итоги и закрытие
+    # при платежах (collects.totals), закрытие и архив задачами,
+    # варианты обложки. save() экземпляра их не перезаписывает.
+    MANAGED_FIELDS = frozenset({
+        'current_amount', 'donators_count', 'payments_count',
+        'is_completed', 'payments_archived_at', 'cover_variants',
+    })
 
     def __str__(self):
         return f"{self.title}"
 
+    def save(self, **kwargs):
+        """
+        Сохраняет сбор без полей MANAGED_FIELDS, если update_fields
+        не заданы: экземпляр мог быть загружен до платежа или задачи,
+        и полное сохранение затерло бы их изменения.
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.MANAGED_FIELDS
+            ]
+        super().save(**kwargs)
+
     class Meta:
         verbose_name = 'Денежный сбор'
         verbose_name_plural = 'Денежные сборы'
         ordering = ['-created_at']
+        indexes = [
+            # Лента сборов и курсорная пагинация.
+            models.Index(
+                fields=['-created_at', 'id'],
+                name='collect_created_idx',
+            ),
+            # Фильтр по поводу в ленте и админке.
+            models.Index(
+                fields=['occasion', '-created_at'],
+                name='collect_occasion_created_idx',
+            ),
+            # Поиск активных сборов с истекающим сроком.
+            models.Index(
+                fields=['end_datetime'],
+                condition=models.Q(is_completed=False),
+                name='collect_active_end_idx',
+            ),
+            # Фильтры и сортировки ленты (collects.feed.FEED_FILTERS).
+            models.Index(
+                fields=['author', '-created_at'],
+                name='collect_author_created_idx',
+            ),
+            models.Index(
+                FUNDING_PROGRESS,
+                models.F('id'),
+                condition=models.Q(
+                    is_completed=False, target_amount__isnull=False
+                ),
+                name='collect_active_progress_idx',
+            ),
+        ]
+
+
+class CollectDonator(models.Model):
+    """
+    Уникальные донатеры сбора.
+    Одна запись на пару (сбор, донатер) позволяет поддерживать
+    точное значение Collect.donators_count без COUNT(DISTINCT ...).
+    """
+
+    collect = models.ForeignKey(
+        Collect,
+        on_delete=models.CASCADE,
+        related_name='donator_entries',
+        verbose_name='Сбор',
+    )
+    donator = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='collect_entries',
+        verbose_name='Донатер',
+    )
+    payments_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество платежей',
+    )
+    amount = models.DecimalField(
+        max_digits=AMOUNT_MAX_DIGITS,
+        decimal_places=AMOUNT_DECIMAL_PLACES,
+        default=0,
+        verbose_name='Сумма платежей',
+    )
+
+    def __str__(self):
+        return f'{self.donator} — {self.collect}'
+
+    class Meta:
+        verbose_name = 'Донатер сбора'
+        verbose_name_plural = 'Донатеры сборов'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['collect', 'donator'],
+                name='unique_collect_donator',
+            ),
+        ]
+        indexes = [
+            # Топ донатеров сбора читается первыми N записями индекса.
+            models.Index(
+                fields=['collect', '-amount'],
+                name='collect_donator_amount_idx',
+            ),
+        ]
+
+
+class OccasionDailyStats(models.Model):
+    """
+    Суточные итоги платежей по поводу сбора.
+    Обновляются при записи платежей, поэтому статистика по поводам
+    и дневные графики читаются без агрегации таблицы платежей.
+    """
+
+    occasion = models.CharField(
+        max_length=20,
+        verbose_name='Повод',
+        choices=Collect.Occasion.choices,
+    )
+    day = models.DateField(verbose_name='День')
+    amount = models.DecimalField(
+        max_digits=AMOUNT_MAX_DIGITS,
+        decimal_places=AMOUNT_DECIMAL_PLACES,
+        default=0,
+        verbose_name='Сумма платежей',
+    )
+    payments_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество платежей',
+    )
+
+    def __str__(self):
+        return f'{self.get_occasion_display()} — {self.day}'
+
+    class Meta:
+        verbose_name = 'Статистика повода за день'
+        verbose_name_plural = 'Статистика поводов по дням'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['occasion', 'day'],
+                name='unique_occasion_day',
+            ),
+        ]
+        indexes = [
+            # Дневной график за период по всем поводам.
+            models.Index(fields=['day'], name='occasion_stats_day_idx'),
+        ]
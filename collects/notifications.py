@@ -0,0 +1,20 @@
+import logging
+
+from collects.models import Collect
+
+
+logger = logging.getLogger('collects_events')
+
+
+def log_completed_collects(collect_ids):
+    """Логирует пачку завершенных сборов одним запросом к БД."""
+    collects = Collect.objects.filter(id__in=collect_ids).only(
+        'id', 'title', 'current_amount', 'target_amount'
+    )
+    for collect in collects:
+        logger.info(
+            f"Сбор завершен: Collect #{collect.id}, "
+            f"Название: {collect.title}, "
+            f"Собрано: {collect.current_amount} из {collect.target_amount}"
+        )
+    return len(collects)
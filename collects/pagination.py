@@ -0,0 +1,22 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class CollectCursorPagination(CursorPagination):
+    """Курсорная пагинация ленты сборов: от новых к старым."""
+
+    ordering = ('-created_at', 'id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class CollectSearchPagination(PageNumberPagination):
+    """
+    Номерные страницы результатов поиска сборов.
+    Результаты упорядочены по релевантности, которая не подходит
+    для позиции курсора, а число совпадений считается по индексу.
+    """
+
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
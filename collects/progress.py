@@ -0,0 +1,142 @@
+import asyncio
+import json
+import logging
+import weakref
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django_redis import get_redis_connection
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from collects.models import Collect
+
+
+logger = logging.getLogger('collects_events')
+
+PROGRESS_CHANNEL = 'donut_tracker:collects:{collect_id}:progress'
+PROGRESS_FIELDS = (
+    'id', 'current_amount', 'donators_count', 'payments_count',
+    'is_completed',
+)
+
+_brokers = weakref.WeakKeyDictionary()
+
+
+def _dumps(progress):
+    return json.dumps(progress, cls=DjangoJSONEncoder)
+
+
+def publish_progress(collect_ids):
+    """
+    Публикует прогресс сборов в Redis одним конвейером.
+    Вызывается после фиксации записи платежей: одно сообщение
+    доходит до всех подписанных клиентов без запросов к БД.
+    """
+    if not settings.COLLECT_PROGRESS_PUBLISH or not collect_ids:
+        return
+    rows = Collect.objects.filter(pk__in=collect_ids).values(
+        *PROGRESS_FIELDS
+    )
+    try:
+        pipe = get_redis_connection('default').pipeline(transaction=False)
+        for row in rows:
+            pipe.publish(
+                PROGRESS_CHANNEL.format(collect_id=row['id']), _dumps(row)
+            )
+        pipe.execute()
+    except RedisError:
+        # Платеж уже сохранен: клиенты получат прогресс со следующим.
+        logger.exception('Не удалось опубликовать прогресс сборов')
+
+
+class ProgressBroker:
+    """
+    Раздает обновления прогресса сборов клиентам процесса.
+    На цикл событий открывается одна подписка Redis по шаблону канала,
+    сообщение раскладывается по очередям клиентов этого сбора.
+    В очереди клиента хранится только последнее состояние.
+    """
+
+    def __init__(self):
+        self._queues = defaultdict(set)
+        self._listener = None
+
+    def subscribe(self, collect_id):
+        queue = asyncio.Queue(maxsize=1)
+        self._queues[collect_id].add(queue)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, collect_id, queue):
+        queues = self._queues.get(collect_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._queues[collect_id]
+
+    def dispatch(self, collect_id, data):
+        for queue in self._queues.get(collect_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(data)
+
+    async def _listen(self):
+        pattern = PROGRESS_CHANNEL.format(collect_id='*')
+        while True:
+            client = aioredis.from_url(settings.CACHES['default']['LOCATION'])
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(pattern)
+                async for message in pubsub.listen():
+                    channel = message['channel'].decode()
+                    collect_id = int(channel.split(':')[-2])
+                    self.dispatch(collect_id, message['data'].decode())
+            except RedisError:
+                logger.exception('Подписка на прогресс сборов прервана')
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+
+
+def get_broker():
+    """Брокер прогресса текущего цикла событий."""
+    loop = asyncio.get_running_loop()
+    if loop not in _brokers:
+        _brokers[loop] = ProgressBroker()
+    return _brokers[loop]
+
+
+def _event(data):
+    return f'event: progress\ndata: {data}\n\n'
+
+
+async def progress_events(collect_id, progress):
+    """
+    Поток server-sent events: текущее состояние сбора,
+    затем обновления из Redis до завершения сбора.
+    Пока обновлений нет, отправляются комментарии-пинги.
+    """
+    broker = get_broker()
+    queue = broker.subscribe(collect_id)
+    try:
+        yield _event(_dumps(progress))
+        if progress['is_completed']:
+            return
+        while True:
+            try:
+                data = await asyncio.wait_for(
+                    queue.get(), settings.COLLECT_PROGRESS_HEARTBEAT
+                )
+            except TimeoutError:
+                yield ': ping\n\n'
+                continue
+            yield _event(data)
+            if json.loads(data)['is_completed']:
+                return
+    finally:
+        broker.unsubscribe(collect_id, queue)
@@ -0,0 +1,65 @@
+from collects.constants import AMOUNT_DECIMAL_PLACES
+from collects.covers import cover_variant_urls
+from collects.models import Collect
+from config.metrics import track_serializer
+from config.projections import datetime_value, decimal_value, file_url
+from payments.projections import payment_short_items
+
+
+# Поля values() для CollectListSerializer.
+COLLECT_VALUES = (
+    'id', 'author_id', 'author__username', 'author__first_name',
+    'author__last_name', 'title', 'description', 'occasion',
+    'target_amount', 'current_amount', 'donators_count', 'payments_count',
+    'end_datetime', 'created_at', 'cover_image', 'cover_variants',
+    'is_completed',
+    # Не выводится: по нему выбирается таблица платежей карточки.
+    'payments_archived_at',
+)
+
+
+def _collect_item(row, request):
+    return {
+        'id': row['id'],
+        'author': row['author_id'],
+        'author_details': {
+            'id': row['author_id'],
+            'username': row['author__username'],
+            'first_name': row['author__first_name'],
+            'last_name': row['author__last_name'],
+        },
+        'title': row['title'],
+        'description': row['description'],
+        'occasion': row['occasion'],
+        'target_amount': decimal_value(
+            row['target_amount'], AMOUNT_DECIMAL_PLACES
+        ),
+        'current_amount': decimal_value(
+            row['current_amount'], AMOUNT_DECIMAL_PLACES
+        ),
+        'donators_count': row['donators_count'],
+        'payments_count': row['payments_count'],
+        'end_datetime': datetime_value(row['end_datetime']),
+        'created_at': datetime_value(row['created_at']),
+        'cover_image': file_url(
+            Collect._meta.get_field('cover_image'), row['cover_image'], request
+        ),
+        'cover_variants': cover_variant_urls(
+            row['cover_variants'], row['cover_image'], request
+        ),
+        'is_completed': row['is_completed'],
+    }
+
+
+def collect_items(rows, request=None):
+    """Сборы из строк values(), как CollectListSerializer(many=True)."""
+    with track_serializer():
+        return [_collect_item(row, request) for row in rows]
+
+
+def collect_detail(row, payment_rows, request=None):
+    """Сбор с платежами из строк values(), как CollectSerializer."""
+    with track_serializer():
+        item = _collect_item(row, request)
+        item['payments'] = payment_short_items(payment_rows)
+        return item
@@ -0,0 +1,72 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+
+# Конфигурация полнотекстового поиска PostgreSQL; та же, что в
+# выражении колонки search_vector (миграция 0008_collect_search).
+SEARCH_CONFIG = 'russian'
+# Внешняя таблица FTS5 над collects_collect для SQLite.
+FTS_TABLE = 'collects_collect_fts'
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def _fts_query(query):
+    """
+    Запрос FTS5 из слов строки поиска: каждое слово в кавычках,
+    поэтому операторы и спецсимволы FTS5 из ввода не разбираются.
+    """
+    return ' '.join(f'"{word}"' for word in _WORD_RE.findall(query))
+
+
+def search_collects(queryset, query):
+    """
+    Сборы, в названии или описании которых есть слова query,
+    с релевантностью search_rank (больше — лучше).
+    В PostgreSQL поиск идет по GIN-индексу колонки search_vector
+    с учетом морфологии, в SQLite — по таблице FTS5 по точным словам.
+    """
+    if not _WORD_RE.search(query):
+        return queryset.none()
+
+    if connection.vendor == 'postgresql':
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        return queryset.filter(
+            RawSQL(
+                f'collects_collect.search_vector @@ {tsquery}',
+                [query],
+                output_field=BooleanField(),
+            )
+        ).annotate(search_rank=RawSQL(
+            f'ts_rank(collects_collect.search_vector, {tsquery})',
+            [query],
+            output_field=FloatField(),
+        ))
+
+    if connection.vendor == 'sqlite':
+        match = _fts_query(query)
+        # bm25 отрицательна: чем меньше, тем релевантнее. Совпадения
+        # в названии весят больше, как вес A колонки search_vector.
+        return queryset.filter(
+            pk__in=RawSQL(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+                [match],
+            )
+        ).annotate(search_rank=RawSQL(
+            f'(SELECT -bm25({FTS_TABLE}, 2.0, 1.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s '
+            f'AND rowid = collects_collect.id)',
+            [match],
+            output_field=FloatField(),
+        ))
+
+    # Другие СУБД: без индекса и ранжирования.
+    condition = Q()
+    for word in _WORD_RE.findall(query):
+        condition &= Q(title__icontains=word) | Q(description__icontains=word)
+    return queryset.filter(condition).annotate(
+        search_rank=RawSQL('0', [], output_field=FloatField())
+    )
@@ -2,9 +2,16 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 from rest_framework import serializers
 
-from payments.serializers import PaymentShortSerializer, UserShortSerializer
 from collects.constants import AMOUNT_DECIMAL_PLACES, AMOUNT_MAX_DIGITS
-from collects.models import Collect
+from collects.covers import cover_variant_urls
+from collects.feed import (
+    ACTIVE_ONLY_ORDERINGS,
+    FEED_FILTERS,
+    FEED_ORDERINGS,
+    feed_filters,
+)
+from payments.serializers import PaymentShortSerializer, UserShortSerializer
+from collects.models import Collect, CollectDonator, OccasionDailyStats
 
 
 User = get_user_model()
@@ -14,13 +21,8 @@ class CollectSerializer(serializers.ModelSerializer):
     """Сериализатор для модели Collect."""
 
     author_details = UserShortSerializer(source='author', read_only=True)
+    cover_variants = serializers.SerializerMethodField()
     payments = PaymentShortSerializer(many=True, read_only=True)
-    current_amount = serializers.DecimalField(
-        max_digits=AMOUNT_MAX_DIGITS,
-        decimal_places=AMOUNT_DECIMAL_PLACES,
-        read_only=True,
-    )
-    donators_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Collect
@@ -34,9 +36,11 @@ class CollectSerializer(serializers.ModelSerializer):
             'target_amount',
             'current_amount',
             'donators_count',
+            'payments_count',
             'end_datetime',
             'created_at',
             'cover_image',
+            'cover_variants',
             'is_completed',
             'payments',
         ]
@@ -46,8 +50,18 @@ class CollectSerializer(serializers.ModelSerializer):
             'author',
             'author_details',
             'is_completed',
+            'current_amount',
+            'donators_count',
+            'payments_count',
         ]
 
+    def get_cover_variants(self, collect):
+        return cover_variant_urls(
+            collect.cover_variants,
+            collect.cover_image.name,
+            self.context.get('request'),
+        )
+
     def validate_end_datetime(self, value):
         if value <= timezone.now():
             raise serializers.ValidationError(
@@ -66,8 +80,118 @@ class CollectSerializer(serializers.ModelSerializer):
         validated_data['author'] = self.context['request'].user
         return super().create(validated_data)
 
-    def get_current_amount(self, obj):
-        return getattr(obj, 'total_amount', 0) or obj.current_amount
 
-    def get_donators_count(self, obj):
-        return getattr(obj, 'total_donators', 0) or obj.donators_count
+class CollectListSerializer(CollectSerializer):
+    """Облегченный сериализатор для ленты сборов без вложенных платежей."""
+
+    payments = None
+
+    class Meta(CollectSerializer.Meta):
+        fields = [
+            field for field in CollectSerializer.Meta.fields
+            if field != 'payments'
+        ]
+
+
+class CollectDonatorSerializer(serializers.ModelSerializer):
+    """Сериализатор строки рейтинга донатеров сбора."""
+
+    donator = UserShortSerializer(read_only=True)
+
+    class Meta:
+        model = CollectDonator
+        fields = ['donator', 'amount', 'payments_count']
+
+
+class OccasionStatsSerializer(serializers.Serializer):
+    """Сериализатор итогов платежей по поводу сбора."""
+
+    occasion = serializers.ChoiceField(choices=Collect.Occasion.choices)
+    amount = serializers.DecimalField(
+        max_digits=AMOUNT_MAX_DIGITS, decimal_places=AMOUNT_DECIMAL_PLACES
+    )
+    payments_count = serializers.IntegerField()
+
+
+class OccasionDailyStatsSerializer(serializers.ModelSerializer):
+    """Сериализатор суточных итогов платежей по поводу сбора."""
+
+    class Meta:
+        model = OccasionDailyStats
+        fields = ['day', 'occasion', 'amount', 'payments_count']
+
+
+class LeaderboardParamsSerializer(serializers.Serializer):
+    """Параметры запроса рейтинга донатеров."""
+
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+
+class StatsParamsSerializer(serializers.Serializer):
+    """Параметры запроса статистики по поводам."""
+
+    days = serializers.IntegerField(min_value=1, max_value=366, default=30)
+    occasion = serializers.ChoiceField(
+        choices=Collect.Occasion.choices, required=False
+    )
+
+
+class CollectFeedParamsSerializer(serializers.Serializer):
+    """
+    Фильтры и сортировка ленты сборов.
+    Принимаются только сочетания из FEED_FILTERS, которые
+    обслуживаются индексами.
+    """
+
+    occasion = serializers.ChoiceField(
+        choices=Collect.Occasion.choices, required=False
+    )
+    author = serializers.IntegerField(required=False)
+    is_completed = serializers.BooleanField(
+        required=False, allow_null=True, default=None
+    )
+    end_after = serializers.DateTimeField(required=False)
+    end_before = serializers.DateTimeField(required=False)
+    ordering = serializers.ChoiceField(
+        choices=list(FEED_ORDERINGS), default='-created_at'
+    )
+
+    def validate(self, attrs):
+        ordering = attrs['ordering'].lstrip('-')
+        filters = feed_filters(attrs)
+        if filters not in FEED_FILTERS[ordering]:
+            allowed = '; '.join(
+                ', '.join(sorted(combination)) or 'без фильтров'
+                for combination in FEED_FILTERS[ordering]
+            )
+            raise serializers.ValidationError(
+                f'Сортировку {ordering} можно сочетать только с '
+                f'фильтрами: {allowed}.'
+            )
+        if (
+            ordering in ACTIVE_ONLY_ORDERINGS
+            and attrs['is_completed'] is not False
+        ):
+            raise serializers.ValidationError(
+                f'Сортировка {ordering} доступна только для активных '
+                f'сборов: is_completed=false.'
+            )
+        return attrs
+
+
+class CollectSearchParamsSerializer(CollectFeedParamsSerializer):
+    """
+    Фильтры результатов поиска сборов.
+    Выборку ограничивает индекс поиска, поэтому допустимы любые
+    сочетания фильтров. Порядок задает релевантность: ordering
+    не принимается.
+    """
+
+    ordering = None
+
+    def validate(self, attrs):
+        if 'ordering' in self.initial_data:
+            raise serializers.ValidationError({
+                'ordering': 'Результаты поиска упорядочены по релевантности.'
+            })
+        return attrs
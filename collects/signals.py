@@ -0,0 +1,36 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from collects.covers import cover_needs_processing
+from collects.models import Collect
+from collects.tasks import complete_funded_collect, process_cover_image
+from config.cache_utils import invalidate_collect
+
+
+@receiver(post_save, sender=Collect)
+@receiver(post_delete, sender=Collect)
+def handle_collect_change(sender, instance, **kwargs):
+    """Сбрасывает кэш сбора после изменения или удаления."""
+    transaction.on_commit(lambda: invalidate_collect(instance.pk))
+
+
+@receiver(post_save, sender=Collect)
+def handle_cover_change(sender, instance, **kwargs):
+    """
+    Ставит обработку обложки в очередь после фиксации транзакции,
+    не задерживая запрос загрузки.
+    """
+    if cover_needs_processing(instance):
+        transaction.on_commit(
+            lambda: process_cover_image.delay(instance.pk)
+        )
+
+
+@receiver(post_save, sender=Collect)
+def handle_target_change(sender, instance, **kwargs):
+    """Закрывает сбор, если после правки цель уже набрана."""
+    if instance.target_amount is None or instance.is_completed:
+        return
+    if complete_funded_collect(instance.pk):
+        instance.is_completed = True
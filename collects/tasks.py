@@ -0,0 +1,93 @@
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from collects.covers import process_cover
+from collects.models import Collect
+from collects.notifications import log_completed_collects
+from collects.progress import publish_progress
+from config.cache_utils import invalidate_collects
+
+
+@shared_task
+def send_collects_completed(collect_ids):
+    """Событие для логирования пачки завершенных сборов."""
+    log_completed_collects(collect_ids)
+
+
+@shared_task
+def process_cover_image(collect_id):
+    """Строит уменьшенные варианты обложки сбора после загрузки."""
+    return process_cover(collect_id)
+
+
+@shared_task
+def complete_expired_collects():
+    """Периодическая задача: закрывает истекшие сборы."""
+    return complete_collects()
+
+
+def _complete_batch(queryset, batch_size):
+    """
+    Закрывает одну пачку сборов одним UPDATE по первичному ключу.
+    Кэш и события обрабатываются после фиксации транзакции.
+    Возвращает идентификаторы пачки.
+    """
+    collect_ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+    if not collect_ids:
+        return collect_ids
+
+    def notify():
+        invalidate_collects(collect_ids)
+        publish_progress(collect_ids)
+        send_collects_completed.delay(collect_ids)
+
+    with transaction.atomic():
+        Collect.objects.filter(pk__in=collect_ids, is_completed=False).update(
+            is_completed=True
+        )
+        transaction.on_commit(notify)
+    return collect_ids
+
+
+def complete_funded_collect(collect_id):
+    """
+    Закрывает сбор, цель которого не больше собранной суммы.
+    Платежи закрывают сбор сами при достижении цели; остается правка
+    целевой суммы, поэтому проверка вызывается при сохранении сбора.
+    Сравнение выполняется в БД по актуальной сумме.
+    Возвращает True, если сбор закрыт.
+    """
+    return bool(_complete_batch(
+        Collect.objects.filter(
+            pk=collect_id,
+            is_completed=False,
+            target_amount__lte=F('current_amount'),
+        ),
+        batch_size=1,
+    ))
+
+
+def complete_collects(now=None, batch_size=None):
+    """
+    Помечает завершенными сборы с прошедшей датой окончания.
+    Сборы выбираются по частичному индексу end_datetime
+    незавершенных сборов. Закрытые сборы выпадают из выборки,
+    поэтому пачки идут без смещения и короткими транзакциями.
+    Возвращает число закрытых сборов.
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or settings.COLLECTS_COMPLETION_BATCH_SIZE
+    queryset = Collect.objects.filter(
+        is_completed=False, end_datetime__lte=now
+    ).order_by('end_datetime')
+
+    completed = 0
+    while True:
+        collect_ids = _complete_batch(queryset, batch_size)
+        if not collect_ids:
+            break
+        completed += len(collect_ids)
+    return completed
@@ -0,0 +1,362 @@
+from collections import Counter, defaultdict
+from itertools import chain
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Q, Subquery, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from collects.models import Collect, CollectDonator, OccasionDailyStats
+from payments.models import ArchivedPayment, Payment
+
+# Платежи сбора лежат целиком в одной из таблиц: архив пополняется
+# только завершенными сборами, которые больше не принимают платежи.
+PAYMENT_MODELS = (Payment, ArchivedPayment)
+
+
+class CollectCapacityError(Exception):
+    """Платеж не может быть принят: сбор завершен или сумма превышена."""
+
+    def __init__(self, message, field, remaining_amount=None):
+        super().__init__(message)
+        self.field = field
+        self.remaining_amount = remaining_amount
+
+
+def _admit(collect_id, amount, payments_count=1):
+    """
+    Резервирует сумму платежей одним условным UPDATE.
+    Проверка остатка и увеличение суммы выполняются атомарно в БД,
+    поэтому параллельные платежи не могут превысить целевую сумму.
+    При достижении цели сбор помечается завершенным.
+    """
+    new_amount = F('current_amount') + amount
+    admitted = Collect.objects.filter(
+        Q(target_amount__isnull=True) | Q(target_amount__gte=new_amount),
+        pk=collect_id,
+        is_completed=False,
+    ).update(
+        current_amount=new_amount,
+        payments_count=F('payments_count') + payments_count,
+        is_completed=Case(
+            When(target_amount__lte=new_amount, then=Value(True)),
+            default=Value(False),
+        ),
+    )
+    if admitted:
+        return
+
+    target_amount, current_amount, is_completed = (
+        Collect.objects.values_list(
+            'target_amount', 'current_amount', 'is_completed'
+        ).get(pk=collect_id)
+    )
+    if is_completed:
+        raise CollectCapacityError(
+            'Сбор уже завершен. Новые платежи не принимаются.',
+            field='collect',
+        )
+    remaining_amount = target_amount - current_amount
+    raise CollectCapacityError(
+        f'Сумма платежа ({amount}) превышает оставшуюся сумму '
+        f'сбора. Максимально можно внести: {remaining_amount}',
+        field='amount',
+        remaining_amount=remaining_amount,
+    )
+
+
+def _add_donator(collect_id, donator_id, payments_count=1, amount=0):
+    """
+    Учитывает платежи донатера в реестре уникальных донатеров сбора.
+    Возвращает True, если донатер впервые поддержал сбор.
+    """
+    entries = CollectDonator.objects.filter(
+        collect_id=collect_id, donator_id=donator_id
+    )
+    changes = {
+        'payments_count': F('payments_count') + payments_count,
+        'amount': F('amount') + amount,
+    }
+    if entries.update(**changes):
+        return False
+
+    try:
+        with transaction.atomic():
+            CollectDonator.objects.create(
+                collect_id=collect_id,
+                donator_id=donator_id,
+                payments_count=payments_count,
+                amount=amount,
+            )
+    except IntegrityError:
+        # Запись успел создать параллельный платеж того же донатера.
+        entries.update(**changes)
+        return False
+    return True
+
+
+def _remove_donator(collect_id, donator_id, amount):
+    """
+    Снимает платеж донатера с учета в реестре уникальных донатеров.
+    Возвращает True, если у донатера не осталось платежей в сборе.
+    """
+    entries = CollectDonator.objects.filter(
+        collect_id=collect_id, donator_id=donator_id
+    )
+    entries.filter(payments_count__gt=0).update(
+        payments_count=F('payments_count') - 1,
+        amount=F('amount') - amount,
+    )
+    deleted, _ = entries.filter(payments_count=0).delete()
+    return bool(deleted)
+
+
+def _payment_day(payment):
+    """День платежа по текущему часовому поясу."""
+    if payment.payment_datetime is None:
+        # Платеж еще не сохранен: дата проставится при вставке.
+        return timezone.localdate()
+    return timezone.localdate(payment.payment_datetime)
+
+
+def _update_daily_stats(collect_id, day, amount, payments_count):
+    """
+    Изменяет суточные итоги повода сбора одним UPDATE.
+    Повод берется подзапросом, без отдельного чтения сбора.
+    Возвращает число обновленных строк.
+    """
+    occasion = Collect.objects.filter(pk=collect_id).values('occasion')
+    return OccasionDailyStats.objects.filter(
+        occasion=Subquery(occasion), day=day
+    ).update(
+        amount=F('amount') + amount,
+        payments_count=F('payments_count') + payments_count,
+    )
+
+
+def _add_daily_stats(collect_id, day, amount, payments_count):
+    """Добавляет платежи сбора в суточные итоги его повода."""
+    if _update_daily_stats(collect_id, day, amount, payments_count):
+        return
+
+    occasion = Collect.objects.values_list('occasion', flat=True).get(
+        pk=collect_id
+    )
+    try:
+        with transaction.atomic():
+            OccasionDailyStats.objects.create(
+                occasion=occasion,
+                day=day,
+                amount=amount,
+                payments_count=payments_count,
+            )
+    except IntegrityError:
+        # Запись за этот день успел создать параллельный платеж.
+        _update_daily_stats(collect_id, day, amount, payments_count)
+
+
+def apply_payments(collect_id, payments):
+    """
+    Добавляет платежи одного сбора в накопленные итоги
+    одним резервированием суммы.
+    Вызывает CollectCapacityError, если платежи не помещаются в сбор;
+    вызывающий код должен откатить транзакцию с сохранением платежей.
+    """
+    per_donator = Counter()
+    donator_amounts = Counter()
+    per_day = Counter()
+    day_amounts = Counter()
+    for payment in payments:
+        per_donator[payment.donator_id] += 1
+        donator_amounts[payment.donator_id] += payment.amount
+        day = _payment_day(payment)
+        per_day[day] += 1
+        day_amounts[day] += payment.amount
+
+    with transaction.atomic():
+        _admit(collect_id, sum(day_amounts.values()), len(payments))
+        new_donators = sum(
+            _add_donator(
+                collect_id, donator_id, count, donator_amounts[donator_id]
+            )
+            for donator_id, count in per_donator.items()
+        )
+        if new_donators:
+            Collect.objects.filter(pk=collect_id).update(
+                donators_count=F('donators_count') + new_donators
+            )
+        for day, count in per_day.items():
+            _add_daily_stats(collect_id, day, day_amounts[day], count)
+
+
+def apply_payment(payment):
+    """Добавляет платеж в накопленные итоги сбора."""
+    apply_payments(payment.collect_id, [payment])
+
+
+def revert_payment(payment):
+    """Вычитает удаленный платеж из накопленных итогов сбора."""
+    with transaction.atomic():
+        is_last_payment = _remove_donator(
+            payment.collect_id, payment.donator_id, payment.amount
+        )
+        Collect.objects.filter(pk=payment.collect_id).update(
+            current_amount=F('current_amount') - payment.amount,
+            payments_count=F('payments_count') - 1,
+            donators_count=F('donators_count') - int(is_last_payment),
+        )
+        _update_daily_stats(
+            payment.collect_id, _payment_day(payment), -payment.amount, -1
+        )
+
+
+def _iter_collect_id_batches(batch_size, collect_ids=None):
+    """Перебирает идентификаторы сборов пачками по первичному ключу."""
+    queryset = Collect.objects.order_by('pk')
+    if collect_ids is not None:
+        queryset = queryset.filter(pk__in=collect_ids)
+
+    last_id = 0
+    while True:
+        batch = list(
+            queryset.filter(pk__gt=last_id)
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]
+
+
+def _find_drift(batch):
+    """
+    Сравнивает сохраненные итоги сборов с фактическими платежами.
+    Возвращает словарь {collect_id: (сумма, платежи, донатеры)}
+    с правильными значениями для разошедшихся сборов.
+    """
+    actual = {
+        row['collect_id']: (row['amount'], row['payments'], row['donators'])
+        for row in chain.from_iterable(
+            model.objects.filter(collect_id__in=batch)
+            .order_by()
+            .values('collect_id')
+            .annotate(
+                amount=Sum('amount'),
+                payments=Count('id'),
+                donators=Count('donator_id', distinct=True),
+            )
+            for model in PAYMENT_MODELS
+        )
+    }
+    ledger = {
+        row['collect_id']: (row['amount'], row['payments'], row['donators'])
+        for row in (
+            CollectDonator.objects.filter(collect_id__in=batch)
+            .order_by()
+            .values('collect_id')
+            .annotate(
+                amount=Sum('amount'),
+                payments=Sum('payments_count'),
+                donators=Count('id'),
+            )
+        )
+    }
+    stored = Collect.objects.filter(pk__in=batch).values_list(
+        'pk', 'current_amount', 'payments_count', 'donators_count'
+    )
+
+    drift = {}
+    for collect_id, amount, payments, donators in stored:
+        expected = actual.get(collect_id, (0, 0, 0))
+        if (
+            (amount, payments, donators) != expected
+            or ledger.get(collect_id, (0, 0, 0)) != expected
+        ):
+            drift[collect_id] = expected
+    return drift
+
+
+def _repair(drift):
+    """Перезаписывает итоги и реестр донатеров для разошедшихся сборов."""
+    collects = []
+    for collect_id, (amount, payments, donators) in drift.items():
+        collects.append(Collect(
+            pk=collect_id,
+            current_amount=amount,
+            payments_count=payments,
+            donators_count=donators,
+        ))
+
+    with transaction.atomic():
+        Collect.objects.bulk_update(
+            collects,
+            ['current_amount', 'payments_count', 'donators_count'],
+        )
+        CollectDonator.objects.filter(collect_id__in=drift).delete()
+        CollectDonator.objects.bulk_create(
+            CollectDonator(
+                collect_id=row['collect_id'],
+                donator_id=row['donator_id'],
+                payments_count=row['payments'],
+                amount=row['amount'],
+            )
+            for row in chain.from_iterable(
+                model.objects.filter(collect_id__in=drift)
+                .order_by()
+                .values('collect_id', 'donator_id')
+                .annotate(payments=Count('id'), amount=Sum('amount'))
+                for model in PAYMENT_MODELS
+            )
+        )
+
+
+def reconcile_totals(collect_ids=None, repair=True, batch_size=1000):
+    """
+    Проверяет накопленные итоги сборов по таблицам платежей и архива
+    и при необходимости исправляет расхождения.
+    Возвращает список идентификаторов сборов с расхождениями.
+    """
+    drifted = []
+    for batch in _iter_collect_id_batches(batch_size, collect_ids):
+        drift = _find_drift(batch)
+        if not drift:
+            continue
+        if repair:
+            _repair(drift)
+        drifted.extend(drift)
+    return drifted
+
+
+def rebuild_daily_stats(batch_size=1000):
+    """
+    Пересчитывает суточные итоги поводов по таблицам платежей и архива
+    агрегирующим запросом к каждой. Возвращает число записей.
+    """
+    buckets = defaultdict(lambda: [0, 0])
+    for model in PAYMENT_MODELS:
+        rows = (
+            model.objects.order_by()
+            .annotate(day=TruncDate('payment_datetime'))
+            .values('collect__occasion', 'day')
+            .annotate(amount=Sum('amount'), payments=Count('id'))
+        )
+        for row in rows.iterator():
+            bucket = buckets[row['collect__occasion'], row['day']]
+            bucket[0] += row['amount']
+            bucket[1] += row['payments']
+
+    with transaction.atomic():
+        OccasionDailyStats.objects.all().delete()
+        created = OccasionDailyStats.objects.bulk_create(
+            [
+                OccasionDailyStats(
+                    occasion=occasion,
+                    day=day,
+                    amount=amount,
+                    payments_count=payments,
+                )
+                for (occasion, day), (amount, payments) in buckets.items()
+            ],
+            batch_size=batch_size,
+        )
+    return len(created)
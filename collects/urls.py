@@ -1,11 +1,31 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from collects.views import CollectViewSet
+from collects.views import (
+    CollectViewSet,
+    async_collect_detail,
+    async_collect_list,
+    collect_progress,
+)
 
 router = DefaultRouter()
 router.register(r'collects', CollectViewSet, basename='collect')
 
 urlpatterns = [
+    path(
+        'collects/<int:pk>/progress/',
+        collect_progress,
+        name='collect-progress',
+    ),
+    path(
+        'async/collects/',
+        async_collect_list,
+        name='collect-async-list',
+    ),
+    path(
+        'async/collects/<int:pk>/',
+        async_collect_detail,
+        name='collect-async-detail',
+    ),
     path('', include(router.urls)),
 ]
@@ -1,33 +1,257 @@
-from django.db.models import Count, Sum
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from datetime import timedelta
+
+from django.db.models import Sum
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
 from rest_framework import viewsets
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser, IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
 
-from collects.models import Collect
-from collects.serializers import CollectSerializer
+from collects.exports import COLLECT_EXPORT_FIELDS
+from collects.feed import apply_feed_filters, filter_feed
+from collects.models import Collect, OccasionDailyStats
+from collects.pagination import (
+    CollectCursorPagination,
+    CollectSearchPagination,
+)
+from collects.progress import PROGRESS_FIELDS, progress_events
+from collects.projections import COLLECT_VALUES, collect_detail, collect_items
+from collects.search import search_collects
+from collects.serializers import (
+    CollectDonatorSerializer,
+    CollectFeedParamsSerializer,
+    CollectListSerializer,
+    CollectSearchParamsSerializer,
+    CollectSerializer,
+    LeaderboardParamsSerializer,
+    OccasionDailyStatsSerializer,
+    OccasionStatsSerializer,
+    StatsParamsSerializer,
+)
 from collects.permissions import IsAuthorOrReadOnly
+from config.async_api import apaginate, async_api_view
+from config.cache_utils import (
+    acache_response,
+    cache_response,
+    collect_list_versions,
+    collect_versions,
+)
+from config.exports import ExportFormatSerializer, streaming_export
+from payments.archive import collect_payments
+from payments.pagination import PaymentCursorPagination
+from payments.projections import PAYMENT_SHORT_VALUES, payment_short_items
+from payments.serializers import PaymentShortSerializer
+
+
+def search_feed(query, query_params):
+    """
+    Сборы ленты по строке поиска с фильтрами ленты из query_params,
+    по убыванию релевантности.
+    """
+    params = CollectSearchParamsSerializer(data=query_params)
+    params.is_valid(raise_exception=True)
+    queryset = apply_feed_filters(
+        Collect.objects.values(*COLLECT_VALUES), params.validated_data
+    )
+    return search_collects(queryset, query).order_by(
+        '-search_rank', '-created_at', 'id'
+    )
 
 
 class CollectViewSet(viewsets.ModelViewSet):
     """Представление для модели Collect."""
 
-    @method_decorator(cache_page(60 * 15))
+    serializer_class = CollectSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
+    pagination_class = CollectCursorPagination
+
+    @cache_response(collect_list_versions)
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        query = request.query_params.get('search', '').strip()
+        if query:
+            return self._search(request, query)
+        params = CollectFeedParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        queryset, self.paginator.ordering = filter_feed(
+            self.get_queryset(), params.validated_data
+        )
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(collect_items(page, request))
 
-    @method_decorator(cache_page(60 * 15))
-    def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+    def _search(self, request, query):
+        """Полнотекстовый поиск по ленте сборов с ранжированием."""
+        paginator = CollectSearchPagination()
+        page = paginator.paginate_queryset(
+            search_feed(query, request.query_params), request, view=self
+        )
+        return paginator.get_paginated_response(collect_items(page, request))
 
-    serializer_class = CollectSerializer
-    permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
+    @cache_response(collect_versions, local=True)
+    def retrieve(self, request, *args, **kwargs):
+        collect = self.get_object()
+        payments = collect_payments(
+            collect['id'], collect['payments_archived_at']
+        ).values(*PAYMENT_SHORT_VALUES)
+        return Response(collect_detail(collect, payments, request))
 
     def get_queryset(self):
-        return Collect.objects.annotate(
-            current_amount=Sum('payments__amount'),
-            donators_count=Count('payments__donator', distinct=True)
-        ).prefetch_related('payments__donator')
+        if self.action in ('list', 'retrieve'):
+            # Чтение идет по строкам values() без экземпляров моделей
+            # и полей DRF; формат ответа тот же, что у сериализаторов.
+            return Collect.objects.values(*COLLECT_VALUES)
+        return Collect.objects.select_related('author')
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return CollectListSerializer
+        return super().get_serializer_class()
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
+
+    @action(
+        detail=True,
+        serializer_class=PaymentShortSerializer,
+        pagination_class=PaymentCursorPagination,
+    )
+    @cache_response(collect_versions)
+    def payments(self, request, pk=None):
+        """Постраничный список платежей сбора."""
+        collect = self.get_object()
+        payments = collect_payments(collect.pk, collect.payments_archived_at)
+        page = self.paginate_queryset(
+            payments.values(*PAYMENT_SHORT_VALUES)
+        )
+        return self.get_paginated_response(payment_short_items(page))
+
+    @action(
+        detail=True,
+        serializer_class=CollectDonatorSerializer,
+        pagination_class=None,
+    )
+    @cache_response(collect_versions)
+    def leaderboard(self, request, pk=None):
+        """Топ донатеров сбора по сумме платежей."""
+        params = LeaderboardParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        collect = self.get_object()
+        entries = (
+            collect.donator_entries.select_related('donator')
+            .order_by('-amount', 'donator_id')
+            [:params.validated_data['limit']]
+        )
+        serializer = self.get_serializer(entries, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, pagination_class=None)
+    @cache_response(collect_list_versions)
+    def stats(self, request):
+        """
+        Итоги платежей по поводам за все время
+        и суточные итоги за последние days дней.
+        """
+        params = StatsParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        buckets = OccasionDailyStats.objects.all()
+        if 'occasion' in params.validated_data:
+            buckets = buckets.filter(
+                occasion=params.validated_data['occasion']
+            )
+
+        occasions = (
+            buckets.values('occasion')
+            .annotate(
+                amount=Sum('amount'),
+                payments_count=Sum('payments_count'),
+            )
+            .order_by('-amount', 'occasion')
+        )
+        since = timezone.localdate() - timedelta(
+            days=params.validated_data['days'] - 1
+        )
+        daily = buckets.filter(day__gte=since).order_by('day', 'occasion')
+        return Response({
+            'occasions': OccasionStatsSerializer(occasions, many=True).data,
+            'daily': OccasionDailyStatsSerializer(daily, many=True).data,
+        })
+
+    @action(
+        detail=False,
+        permission_classes=[IsAdminUser],
+        pagination_class=None,
+    )
+    def export(self, request):
+        """Потоковая выгрузка отчета по сборам в CSV или NDJSON."""
+        params = ExportFormatSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return streaming_export(
+            Collect.objects.all(),
+            COLLECT_EXPORT_FIELDS,
+            params.validated_data['file_format'],
+            'collects',
+            request,
+        )
+
+
+@require_GET
+async def collect_progress(request, pk):
+    """
+    Асинхронный поток прогресса сбора в формате server-sent events.
+    База читается один раз при подключении, дальше обновления
+    приходят из Redis pub/sub.
+    """
+    progress = await Collect.objects.filter(pk=pk).values(
+        *PROGRESS_FIELDS
+    ).afirst()
+    if progress is None:
+        raise Http404
+    response = StreamingHttpResponse(
+        progress_events(pk, progress), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@async_api_view
+@acache_response('collect-async:list', collect_list_versions)
+async def async_collect_list(request):
+    """Асинхронная лента сборов, ответ как у CollectViewSet.list."""
+    query = request.query_params.get('search', '').strip()
+    if query:
+        paginator, page = await apaginate(
+            CollectSearchPagination,
+            search_feed(query, request.query_params),
+            request,
+        )
+    else:
+        params = CollectFeedParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        queryset, ordering = filter_feed(
+            Collect.objects.values(*COLLECT_VALUES), params.validated_data
+        )
+        paginator, page = await apaginate(
+            CollectCursorPagination, queryset, request, ordering
+        )
+    return paginator.get_paginated_response(
+        collect_items(page, request)
+    ).data
+
+
+@async_api_view
+@acache_response('collect-async:retrieve', collect_versions, local=True)
+async def async_collect_detail(request, pk):
+    """Асинхронная карточка сбора, ответ как у CollectViewSet.retrieve."""
+    collect = await Collect.objects.values(*COLLECT_VALUES).filter(
+        pk=pk
+    ).afirst()
+    if collect is None:
+        raise Http404
+    payments = [
+        payment async for payment in collect_payments(
+            pk, collect['payments_archived_at']
+        ).values(*PAYMENT_SHORT_VALUES)
+    ]
+    return collect_detail(collect, payments, request)
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_count(queryset):
+    """
+    Оценка числа строк таблицы из статистики планировщика PostgreSQL.
+    Возвращает None для запросов с условиями, других СУБД
+    и таблиц, для которых статистика еще не собиралась.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql' or queryset.query.where:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор списков админки для больших таблиц.
+    Без фильтров число строк берется из статистики PostgreSQL вместо
+    COUNT(*) по всей таблице, если оно не меньше
+    ADMIN_ESTIMATED_COUNT_THRESHOLD; иначе считается точно.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if (
+            estimate is not None
+            and estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD
+        ):
+            return estimate
+        return super().count
+
+
+class LargeTableAdminMixin:
+    """
+    Настройки списка админки для таблиц на миллионы строк:
+    оценочное число строк и без второго COUNT(*) при фильтрации.
+    Сортировка по первичному ключу идет по индексу.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ('-pk',)
@@ -14,3 +14,13 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.DEBUG:
+    # Статика админки в разработке, как у runserver.
+    from django.contrib.staticfiles.handlers import (  # noqa: E402
+        ASGIStaticFilesHandler,
+    )
+
+    application = ASGIStaticFilesHandler(application)
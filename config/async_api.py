@@ -0,0 +1,106 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import exceptions
+from rest_framework.authentication import get_authorization_header
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+
+from config.authentication import atoken_user
+from config.renderers import FastJSONRenderer
+
+
+TOKEN_KEYWORD = 'Token'
+
+
+async def aauthenticate(request):
+    """
+    Асинхронная аутентификация по токену DRF или по сессии.
+    Без заголовка Authorization возвращает пользователя сессии,
+    в том числе анонимного.
+    """
+    auth = get_authorization_header(request).split()
+    if not auth or auth[0].lower() != TOKEN_KEYWORD.lower().encode():
+        return await request.auser()
+    if len(auth) != 2:
+        raise exceptions.AuthenticationFailed(
+            'Неверный заголовок токена.'
+        )
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        raise exceptions.AuthenticationFailed('Недействительный токен.')
+    return await atoken_user(key)
+
+
+def render_json(data, status=200):
+    """Ответ с тем же JSON, что отдают представления DRF."""
+    return HttpResponse(
+        FastJSONRenderer().render(data),
+        status=status,
+        content_type='application/json',
+    )
+
+
+def async_api_view(view_func):
+    """
+    Асинхронное представление только для чтения.
+    Представление получает Request DRF с аутентифицированным
+    пользователем и возвращает данные ответа. Ошибки API
+    превращаются в ответы обработчиком исключений DRF.
+    """
+
+    @require_GET
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        drf_request = Request(request)
+        try:
+            drf_request.user = await aauthenticate(request)
+            data = await view_func(drf_request, *args, **kwargs)
+        except Exception as exc:
+            if isinstance(exc, (
+                exceptions.NotAuthenticated, exceptions.AuthenticationFailed
+            )):
+                # Как TokenAuthentication в синхронных представлениях: 401.
+                exc.auth_header = TOKEN_KEYWORD
+            response = exception_handler(exc, {'request': drf_request})
+            if response is None:
+                raise
+            error = render_json(response.data, response.status_code)
+            if response.has_header('WWW-Authenticate'):
+                error['WWW-Authenticate'] = response['WWW-Authenticate']
+            return error
+        return render_json(data)
+
+    return wrapper
+
+
+def authenticated_only(view_func):
+    """Асинхронный аналог IsAuthenticated для async_api_view."""
+
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            raise exceptions.NotAuthenticated
+        return await view_func(request, *args, **kwargs)
+
+    return wrapper
+
+
+async def apaginate(pagination_class, queryset, request, ordering=None):
+    """
+    Страница пагинации DRF для асинхронного представления.
+    Пагинатор DRF читает страницу синхронно, поэтому выполняется
+    в потоке sync_to_async, как и запросы async ORM Django.
+    ordering заменяет порядок курсорной пагинации.
+    Возвращает пагинатор и объекты страницы.
+    """
+    paginator = pagination_class()
+    if ordering is not None:
+        paginator.ordering = ordering
+    page = await sync_to_async(paginator.paginate_queryset)(
+        queryset, request
+    )
+    return paginator, page
@@ -0,0 +1,117 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+# Идентификатор пользователя токена. В ключе хэш, а не сам токен.
+AUTH_TOKEN_KEY = 'auth:token:{digest}'
+# Поля пользователя для проверок доступа; ключ строится по
+# идентификатору, поэтому сброс не требует поиска токенов.
+AUTH_USER_KEY = 'auth:user:{user_id}'
+
+User = get_user_model()
+
+# Кэшируются только поля, нужные для обработки запроса, без пароля
+# и личных данных; остальные поля загружаются из БД при обращении.
+AUTH_USER_FIELDS = [
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in ('id', 'is_active', 'is_staff', 'is_superuser')
+]
+
+
+def token_cache_key(key):
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return AUTH_TOKEN_KEY.format(digest=digest)
+
+
+def user_cache_key(user_id):
+    return AUTH_USER_KEY.format(user_id=user_id)
+
+
+def _user(values):
+    """Пользователь из закэшированных полей, остальные отложены."""
+    if values is None:
+        raise exceptions.AuthenticationFailed('Недействительный токен.')
+    user = User.from_db(
+        router.db_for_read(User), AUTH_USER_FIELDS, values
+    )
+    if not user.is_active:
+        raise exceptions.AuthenticationFailed(
+            'Пользователь неактивен или удален.'
+        )
+    return user
+
+
+def _token_user_values(key):
+    return User.objects.filter(auth_token__key=key).values_list(
+        *AUTH_USER_FIELDS
+    )
+
+
+def _cache_entries(key, values):
+    return {
+        token_cache_key(key): values[0],
+        user_cache_key(values[0]): values,
+    }
+
+
+def token_user(key):
+    """
+    Пользователь токена DRF: из кэша или одним запросом к БД.
+    Записи живут AUTH_TOKEN_CACHE_TTL секунд и удаляются раньше
+    при удалении токена или изменении пользователя (users.signals).
+    """
+    user_id = cache.get(token_cache_key(key))
+    values = None
+    if user_id is not None:
+        values = cache.get(user_cache_key(user_id))
+    if values is None:
+        values = _token_user_values(key).first()
+        if values is not None:
+            cache.set_many(
+                _cache_entries(key, values), settings.AUTH_TOKEN_CACHE_TTL
+            )
+    return _user(values)
+
+
+async def atoken_user(key):
+    """Асинхронный вариант token_user."""
+    user_id = await cache.aget(token_cache_key(key))
+    values = None
+    if user_id is not None:
+        values = await cache.aget(user_cache_key(user_id))
+    if values is None:
+        values = await _token_user_values(key).afirst()
+        if values is not None:
+            await cache.aset_many(
+                _cache_entries(key, values), settings.AUTH_TOKEN_CACHE_TTL
+            )
+    return _user(values)
+
+
+def invalidate_tokens(keys):
+    """Удаляет из кэша токены keys."""
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+def invalidate_user(user_id):
+    """Удаляет из кэша поля пользователя для аутентификации."""
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication без запроса к БД на каждый запрос:
+    пользователь токена берется из кэша.
+    """
+
+    def authenticate_credentials(self, key):
+        user = token_user(key)
+        # request.auth остается токеном, как в TokenAuthentication.
+        return user, Token(key=key, user=user)
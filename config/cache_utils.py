@@ -1,11 +1,444 @@
-from django.core.cache import cache
+import asyncio
+import hashlib
+import threading
+import time
+import weakref
+from collections import Counter, defaultdict
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django_redis.cache import RedisCache
+from redis import asyncio as aioredis
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+from config.local_cache import (
+    ensure_listener,
+    local_cache,
+    publish_invalidation,
+)
+from config.metrics import record_cache
+
+
+COLLECTS_LIST_GENERATION_KEY = 'collects:list:generation'
+COLLECT_VERSION_KEY = 'collects:{collect_id}:version'
+USER_PAYMENTS_VERSION_KEY = 'payments:user:{user_id}:version'
+# Время последнего изменения счетчика версий хранится рядом с ним.
+MODIFIED_KEY = '{key}:modified'
+
+# Уровни кэша ответов: память процесса и Redis.
+LOCAL_TIER = 'local'
+REDIS_TIER = 'redis'
+
+_stats = defaultdict(Counter)
+_stats_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _initial_version():
+    """
+    Начальное значение счетчика версий.
+    Счетчик, вытесненный из кэша, начинается с нового значения,
+    поэтому старые ответы под прежними ключами не переиспользуются.
+    """
+    return time.time_ns()
+
+
+def get_version_stamps(*keys):
+    """
+    Значения счетчиков версий и Unix-время их последнего изменения
+    за один запрос к кэшу.
+    """
+    modified_keys = [MODIFIED_KEY.format(key=key) for key in keys]
+    values = cache.get_many([*keys, *modified_keys])
+    now = time.time()
+    for key, modified_key in zip(keys, modified_keys):
+        if values.get(key) is None:
+            if cache.add(key, _initial_version(), timeout=None):
+                cache.set(modified_key, now, timeout=None)
+            values[key] = cache.get(key, 0)
+        if values.get(modified_key) is None:
+            cache.add(modified_key, now, timeout=None)
+            values[modified_key] = cache.get(modified_key, now)
+    return (
+        [values[key] for key in keys],
+        [values[key] for key in modified_keys],
+    )
+
+
+def get_versions(*keys):
+    """Возвращает значения счетчиков версий за один запрос к кэшу."""
+    return get_version_stamps(*keys)[0]
+
+
+def bump_version(key):
+    """Увеличивает счетчик версий, делая связанные ключи неактуальными."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_version(), timeout=None)
+    cache.set(MODIFIED_KEY.format(key=key), time.time(), timeout=None)
+
+
+def bump_versions(*keys):
+    """
+    Увеличивает счетчики версий и сбрасывает зависящие от них записи
+    локального кэша во всех процессах одним сообщением.
+    """
+    for key in keys:
+        bump_version(key)
+    publish_invalidation(keys)
+
+
+def _request_fingerprint(request):
+    """Хэш хоста, пути и отсортированных параметров запроса."""
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    raw = f'{request.get_host()}{request.path}?{query}'
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+def _principal(request):
+    """Идентификатор аутентифицированного пользователя для ключа кэша."""
+    user = request.user
+    if user and user.is_authenticated:
+        return f'user{user.pk}'
+    return 'anon'
+
+
+def _key_suffix(request, vary_on_user):
+    """Часть ключа кэша, не зависящая от версий."""
+    parts = [_principal(request)] if vary_on_user else []
+    parts.append(_request_fingerprint(request))
+    return ':'.join(parts)
+
+
+def collect_list_versions(view, request, *args, **kwargs):
+    """Счетчики версий ленты сборов."""
+    return [COLLECTS_LIST_GENERATION_KEY]
+
+
+def collect_versions(view, request, *args, **kwargs):
+    """
+    Счетчики версий сбора и его вложенных ресурсов.
+    У асинхронных представлений view нет, сбор передается в pk.
+    """
+    if view is None:
+        collect_id = kwargs['pk']
+    else:
+        collect_id = kwargs[view.lookup_url_kwarg or view.lookup_field]
+    return [COLLECT_VERSION_KEY.format(collect_id=collect_id)]
+
+
+def user_payments_versions(view, request, *args, **kwargs):
+    """Счетчики версий платежей текущего пользователя."""
+    return [USER_PAYMENTS_VERSION_KEY.format(user_id=request.user.pk)]
+
+
+def invalidate_collect(collect_id):
+    """Сбрасывает кэш сбора и ленты сборов."""
+    bump_versions(
+        COLLECT_VERSION_KEY.format(collect_id=collect_id),
+        COLLECTS_LIST_GENERATION_KEY,
+    )
+
+
+def invalidate_collects(collect_ids):
+    """
+    Сбрасывает кэш пачки сборов и ленты сборов.
+    Счетчики версий удаляются одним запросом к кэшу: при следующем
+    чтении они начнутся с нового значения.
+    """
+    keys = [
+        COLLECT_VERSION_KEY.format(collect_id=collect_id)
+        for collect_id in collect_ids
+    ]
+    cache.delete_many(
+        keys + [MODIFIED_KEY.format(key=key) for key in keys]
+    )
+    bump_version(COLLECTS_LIST_GENERATION_KEY)
+    publish_invalidation([*keys, COLLECTS_LIST_GENERATION_KEY])
+
+
+def invalidate_user_payments(user_id):
+    """Сбрасывает кэш списка платежей пользователя."""
+    bump_versions(USER_PAYMENTS_VERSION_KEY.format(user_id=user_id))
+
+
+def invalidate_users_payments(user_ids):
+    """Сбрасывает кэш списков платежей нескольких пользователей."""
+    bump_versions(*(
+        USER_PAYMENTS_VERSION_KEY.format(user_id=user_id)
+        for user_id in user_ids
+    ))
 
 
 def clear_collects_cache():
-    """Очистка кэша для представлений Collect."""
-    cache.delete_pattern('*collects*')
+    """Очистка кэша ленты сборов."""
+    bump_versions(COLLECTS_LIST_GENERATION_KEY)
+
+
+def _record(name, outcome, tier=REDIS_TIER):
+    """Учитывает попадание или промах уровня кэша ответов."""
+    with _stats_lock:
+        _stats[tier, name][outcome] += 1
+    if outcome == 'hits' or tier == REDIS_TIER:
+        record_cache(outcome)
+
+
+def get_cache_stats(tier=REDIS_TIER):
+    """
+    Счетчики попаданий и промахов уровня кэша ответов
+    в текущем процессе. До Redis доходят только промахи
+    локального уровня.
+    """
+    with _stats_lock:
+        return {
+            name: dict(counts)
+            for (stats_tier, name), counts in _stats.items()
+            if stats_tier == tier
+        }
+
+
+def render_cache_metrics():
+    """Попадания, промахи и доля попаданий уровней кэша для Prometheus."""
+    with _stats_lock:
+        snapshot = {key: dict(counts) for key, counts in _stats.items()}
+    lines = [
+        '# HELP donut_response_cache_total Обращения к кэшу ответов',
+        '# TYPE donut_response_cache_total counter',
+    ]
+    ratios = [
+        '# HELP donut_response_cache_hit_ratio Доля попаданий в кэш ответов',
+        '# TYPE donut_response_cache_hit_ratio gauge',
+    ]
+    for (tier, name), counts in sorted(snapshot.items()):
+        labels = f'cache="{name}",tier="{tier}"'
+        hits = counts.get('hits', 0)
+        misses = counts.get('misses', 0)
+        lines.append(
+            f'donut_response_cache_total{{{labels},result="hit"}} {hits}'
+        )
+        lines.append(
+            f'donut_response_cache_total{{{labels},result="miss"}} {misses}'
+        )
+        ratios.append(
+            f'donut_response_cache_hit_ratio{{{labels}}} '
+            f'{hits / max(hits + misses, 1):.4f}'
+        )
+    return '\n'.join(lines + ratios) + '\n'
+
+
+def _validators(key, versions, modified):
+    """
+    ETag и время изменения ответа с ключом кэша key.
+    Ключ включает значения счетчиков версий, поэтому меняется вместе
+    с данными. Если счетчики не сохранились в кэше (DummyCache,
+    недоступный Redis), версия неизвестна и валидаторов нет.
+    ETag слабый: представления в разных форматах равнозначны.
+    """
+    if not all(versions):
+        return None, None
+    digest = hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"', int(max(modified))
+
+
+def _set_validators(response, etag, last_modified):
+    if etag is not None:
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def _conditional_response(request, etag, last_modified):
+    """
+    Ответ 304 по If-None-Match, если копия клиента актуальна, иначе None.
+    Один If-Modified-Since не подтверждает копию: он сравнивается
+    с точностью до секунды и пропустил бы запись в ту же секунду.
+    """
+    if etag is None or 'HTTP_IF_NONE_MATCH' not in request.META:
+        return None
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        return None
+    return _set_validators(response, etag, last_modified)
+
+
+def _local_get(name, local_key):
+    """Данные из локального уровня кэша или None."""
+    ensure_listener()
+    data = local_cache.get(local_key)
+    _record(name, 'hits' if data is not None else 'misses', LOCAL_TIER)
+    return data
+
+
+def cache_response(
+    versions_func, vary_on_user=False, timeout=None, local=False
+):
+    """
+    Кэширует данные ответа DRF.
+    Ключ включает представление и действие, значения счетчиков версий
+    из versions_func, параметры запроса и, при vary_on_user,
+    аутентифицированного пользователя. Сохраняются только успешные
+    ответы; рендеринг выполняется для каждого запроса, поэтому
+    согласование формата не нарушается.
+    При local перед Redis проверяется LRU-кэш процесса: его ключ
+    без версий, а записи сбрасываются вместе со счетчиками.
+    Ответ получает ETag и Last-Modified по счетчикам версий; если
+    копия клиента актуальна, отдается 304 без чтения кэша и БД.
+    """
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(view, request, *args, **kwargs):
+            name = f'{view.basename}:{view.action}'
+            version_keys = versions_func(view, request, *args, **kwargs)
+            suffix = _key_suffix(request, vary_on_user)
+            use_local = local and local_cache.enabled
+            if use_local:
+                local_key = f'{name}:{suffix}'
+                epoch = local_cache.epoch
+                cached = _local_get(name, local_key)
+                if cached is not None:
+                    data, etag, last_modified = cached
+                    return _conditional_response(
+                        request, etag, last_modified
+                    ) or _set_validators(Response(data), etag, last_modified)
+
+            versions, modified = get_version_stamps(*version_keys)
+            key = ':'.join([name, *map(str, versions), suffix])
+            etag, last_modified = _validators(key, versions, modified)
+            not_modified = _conditional_response(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+
+            data = cache.get(key)
+            if data is not None:
+                _record(name, 'hits')
+                response = Response(data)
+            else:
+                _record(name, 'misses')
+                response = view_method(view, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                data = response.data
+                cache.set(
+                    key,
+                    data,
+                    timeout if timeout is not None else settings.CACHE_TTL,
+                )
+            if use_local:
+                local_cache.set(
+                    local_key, (data, etag, last_modified), version_keys, epoch
+                )
+            return _set_validators(response, etag, last_modified)
+
+        return wrapper
+
+    return decorator
+
+
+def _async_redis():
+    """
+    Клиент redis.asyncio текущего цикла событий для кэша django_redis.
+    None, если кэш не в Redis: тогда используются async-методы
+    бэкенда Django.
+    """
+    if not isinstance(caches['default'], RedisCache):
+        return None
+    loop = asyncio.get_running_loop()
+    if loop not in _async_clients:
+        _async_clients[loop] = aioredis.from_url(
+            settings.CACHES['default']['LOCATION']
+        )
+    return _async_clients[loop]
+
+
+async def _aget_many(keys):
+    """Асинхронный cache.get_many в формате значений django_redis."""
+    client = _async_redis()
+    if client is None:
+        return await cache.aget_many(keys)
+    backend = caches['default']
+    values = await client.mget([backend.make_key(key) for key in keys])
+    return {
+        key: backend.client.decode(value)
+        for key, value in zip(keys, values)
+        if value is not None
+    }
+
+
+async def _aset(key, value, timeout, only_new=False):
+    """Асинхронные cache.set и, при only_new, cache.add."""
+    client = _async_redis()
+    if client is None:
+        if only_new:
+            return await cache.aadd(key, value, timeout)
+        return await cache.aset(key, value, timeout)
+    backend = caches['default']
+    return await client.set(
+        backend.make_key(key),
+        backend.client.encode(value),
+        ex=timeout,
+        nx=only_new,
+    )
+
+
+async def aget_versions(*keys):
+    """Асинхронный вариант get_versions."""
+    versions = await _aget_many(keys)
+    for key in keys:
+        if versions.get(key) is None:
+            await _aset(key, _initial_version(), None, only_new=True)
+            versions[key] = (await _aget_many([key])).get(key, 0)
+    return [versions[key] for key in keys]
+
+
+def acache_response(
+    name, versions_func, vary_on_user=False, timeout=None, local=False
+):
+    """
+    Кэширует данные асинхронного представления по тем же правилам,
+    что и cache_response. Счетчики версий общие с синхронными
+    представлениями, поэтому сброс кэша после записи действует и здесь.
+    versions_func вызывается с view=None.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            version_keys = versions_func(None, request, *args, **kwargs)
+            suffix = _key_suffix(request, vary_on_user)
+            use_local = local and local_cache.enabled
+            if use_local:
+                local_key = f'{name}:{suffix}'
+                epoch = local_cache.epoch
+                data = _local_get(name, local_key)
+                if data is not None:
+                    return data
+
+            versions = await aget_versions(*version_keys)
+            key = ':'.join([name, *map(str, versions), suffix])
+            data = (await _aget_many([key])).get(key)
+            if data is not None:
+                _record(name, 'hits')
+            else:
+                _record(name, 'misses')
+                data = await view_func(request, *args, **kwargs)
+                await _aset(
+                    key,
+                    data,
+                    timeout if timeout is not None else settings.CACHE_TTL,
+                )
+            if use_local:
+                local_cache.set(local_key, data, version_keys, epoch)
+            return data
 
+        return wrapper
 
-def clear_payments_cache():
-    """Очистка кэша для представлений Payment."""
-    cache.delete_pattern('*payments*')
+    return decorator
@@ -0,0 +1,160 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django_redis import get_redis_connection
+from django_redis.cache import RedisCache
+from redis.exceptions import RedisError
+
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = 'donut_tracker:cache:invalidate'
+
+
+class LocalCache:
+    """
+    LRU-кэш ответов в памяти процесса с TTL и ограничением числа записей.
+    Запись помечается счетчиками версий, от которых зависит, и
+    сбрасывается вместе с ними. Данные хранятся без копирования,
+    поэтому изменять полученные значения нельзя.
+    Размер и TTL читаются из настроек при каждом обращении.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._tags = defaultdict(set)
+        self._lock = threading.Lock()
+        self._epoch = 0
+
+    @property
+    def enabled(self):
+        return settings.LOCAL_CACHE_MAX_ENTRIES > 0
+
+    @property
+    def epoch(self):
+        """Номер последнего сброса; берется до чтения данных для set."""
+        return self._epoch
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value, _ = entry
+            if expires <= time.monotonic():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, tags, epoch):
+        """
+        Сохраняет значение, если с момента epoch не было сбросов:
+        иначе оно могло быть прочитано до записи, вызвавшей сброс.
+        """
+        expires = time.monotonic() + settings.LOCAL_CACHE_TTL
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            self._discard(key)
+            self._entries[key] = (expires, value, tags)
+            for tag in tags:
+                self._tags[tag].add(key)
+            while len(self._entries) > settings.LOCAL_CACHE_MAX_ENTRIES:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate(self, tags):
+        """Удаляет записи, помеченные любым из счетчиков tags."""
+        with self._lock:
+            self._epoch += 1
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._tags.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+
+local_cache = LocalCache()
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+
+def _uses_redis():
+    return isinstance(caches['default'], RedisCache)
+
+
+def publish_invalidation(tags):
+    """
+    Сбрасывает записи локального кэша в этом и других процессах.
+    Остальные процессы получают счетчики через Redis pub/sub;
+    потерянное сообщение ограничено LOCAL_CACHE_TTL.
+    """
+    if not local_cache.enabled:
+        return
+    local_cache.invalidate(tags)
+    if not _uses_redis():
+        return
+    try:
+        get_redis_connection('default').publish(
+            INVALIDATION_CHANNEL, json.dumps(list(tags))
+        )
+    except RedisError:
+        logger.exception('Не удалось разослать сброс локального кэша')
+
+
+def _listen():
+    while True:
+        try:
+            pubsub = get_redis_connection('default').pubsub(
+                ignore_subscribe_messages=True
+            )
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            # Сбросы до подписки не получены: начинаем с пустого кэша.
+            local_cache.clear()
+            for message in pubsub.listen():
+                local_cache.invalidate(json.loads(message['data']))
+        except RedisError:
+            logger.exception('Подписка на сброс локального кэша прервана')
+            time.sleep(1)
+
+
+def ensure_listener():
+    """
+    Запускает поток подписки на сбросы в текущем процессе.
+    Проверка pid нужна для воркеров, созданных fork после запуска.
+    """
+    global _listener_pid
+    if _listener_pid == os.getpid() or not _uses_redis():
+        return
+    with _listener_lock:
+        if _listener_pid == os.getpid():
+            return
+        threading.Thread(
+            target=_listen, name='local-cache-invalidation', daemon=True
+        ).start()
+        _listener_pid = os.getpid()
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from payments.archive import archive_payments
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит платежи давно завершенных сборов в архивную таблицу; '
+        'итоги сборов остаются замороженными.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help=(
+                'Сколько дней должно пройти после окончания сбора '
+                '(по умолчанию PAYMENTS_ARCHIVE_AFTER_DAYS)'
+            ),
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Количество сборов, переносимых одной транзакцией',
+        )
+
+    def handle(self, *args, **options):
+        collects, payments = archive_payments(
+            days=options['days'], batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено в архив: сборов {collects}, платежей {payments}.'
+        ))
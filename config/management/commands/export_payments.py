@@ -0,0 +1,78 @@
+from django.core.management.base import BaseCommand
+
+from config.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, iter_export
+from payments.exports import PAYMENT_EXPORT_FIELDS, payments_for_export
+
+
+class Command(BaseCommand):
+    help = 'Выгружает платежи в CSV или NDJSON с постоянным расходом памяти.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            dest='file_format',
+            choices=list(EXPORT_FORMATS),
+            default='csv',
+            help='Формат выгрузки',
+        )
+        parser.add_argument(
+            '--collect',
+            type=int,
+            help='Выгрузить только платежи указанного сбора',
+        )
+        parser.add_argument(
+            '--donator',
+            type=int,
+            help='Выгрузить только платежи указанного донатера',
+        )
+        parser.add_argument(
+            '--archived',
+            action='store_true',
+            help=(
+                'Выгрузить архив платежей; для --collect таблица '
+                'выбирается автоматически'
+            ),
+        )
+        parser.add_argument(
+            '--output',
+            help='Путь к файлу выгрузки (по умолчанию stdout)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help='Количество строк, читаемых из БД за раз',
+        )
+
+    def handle(self, *args, **options):
+        lines = iter_export(
+            payments_for_export(
+                collect_id=options['collect'],
+                donator_id=options['donator'],
+                archived=options['archived'],
+            ),
+            PAYMENT_EXPORT_FIELDS,
+            options['file_format'],
+            options['chunk_size'],
+        )
+
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        count = 0
+        with open(
+            options['output'], 'w', encoding='utf-8', newline=''
+        ) as output:
+            for line in lines:
+                output.write(line)
+                count += 1
+        if options['file_format'] == 'csv':
+            # Первая строка CSV — заголовок.
+            count -= 1
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Выгружено строк: {count} в {options["output"]}'
+            )
+        )
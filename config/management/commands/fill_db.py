@@ -1,16 +1,164 @@
+import multiprocessing
 import random
+import time
+from collections import Counter
+from datetime import timezone
+from decimal import Decimal
 
-from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
 from faker import Faker
 
-from collects.models import Collect
+from collects.models import Collect, CollectDonator
+from collects.totals import rebuild_daily_stats
 from payments.models import Payment
 
 
 User = get_user_model()
-fake = Faker('ru_RU')
+
+DEFAULT_PASSWORD = 'verystrongpass999'
+# Размер пулов заранее сгенерированных Faker строк. Faker медленный,
+# поэтому для каждой строки БД выбирается готовое значение из пула.
+FAKE_POOL_SIZE = 500
+OCCASIONS = [choice for choice, _ in Collect.Occasion.choices]
+
+
+def _fake_pools(seed):
+    """Пулы строк Faker, детерминированные относительно seed."""
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed)
+    return {
+        'username': [fake.user_name()[:20] for _ in range(FAKE_POOL_SIZE)],
+        'first_name': [fake.first_name() for _ in range(FAKE_POOL_SIZE)],
+        'last_name': [fake.last_name() for _ in range(FAKE_POOL_SIZE)],
+        'title': [
+            fake.sentence(nb_words=4)[:35] for _ in range(FAKE_POOL_SIZE)
+        ],
+        'description': [
+            fake.text(max_nb_chars=200) for _ in range(FAKE_POOL_SIZE)
+        ],
+        'end_datetime': [
+            fake.future_datetime(end_date='+30d', tzinfo=timezone.utc)
+            for _ in range(FAKE_POOL_SIZE)
+        ],
+    }
+
+
+def _plan_payments(rng, donator_ids, target_amount, max_payments):
+    """
+    План платежей сбора: список (донатер, сумма, скрыть сумму).
+    Сумма платежей не превышает целевую, последний платеж
+    добирает остаток до цели.
+    """
+    plan = []
+    current_total = 0
+    for _ in range(rng.randint(1, max_payments)):
+        amount = rng.randint(100, 1000)
+        if current_total + amount > target_amount:
+            amount = target_amount - current_total
+        plan.append((rng.choice(donator_ids), amount, rng.random() < 0.5))
+        current_total += amount
+        if current_total >= target_amount:
+            break
+    return plan
+
+
+def _create_chunk(chunk, batch_size):
+    """Создает пачку сборов с их платежами и реестром донатеров."""
+    with transaction.atomic():
+        collects = Collect.objects.bulk_create(
+            [collect for collect, _ in chunk], batch_size=batch_size
+        )
+        payments = []
+        entries = []
+        for collect, (_, plan) in zip(collects, chunk):
+            counts = Counter()
+            amounts = Counter()
+            for donator_id, amount, _ in plan:
+                counts[donator_id] += 1
+                amounts[donator_id] += amount
+            entries.extend(
+                CollectDonator(
+                    collect_id=collect.pk,
+                    donator_id=donator_id,
+                    payments_count=count,
+                    amount=amounts[donator_id],
+                )
+                for donator_id, count in counts.items()
+            )
+            payments.extend(
+                Payment(
+                    collect_id=collect.pk,
+                    donator_id=donator_id,
+                    amount=amount,
+                    hide_amount=hide_amount,
+                )
+                for donator_id, amount, hide_amount in plan
+            )
+        Payment.objects.bulk_create(payments, batch_size=batch_size)
+        CollectDonator.objects.bulk_create(entries, batch_size=batch_size)
+    return len(collects), len(payments)
+
+
+def generate_collects(
+    author_ids, donator_ids, collects_per_user, max_payments,
+    batch_size, seed
+):
+    """
+    Создает сборы авторов author_ids потоком пачек.
+    В памяти одновременно держится не больше batch_size платежей:
+    итоги сборов считаются по плану платежей до вставки,
+    поэтому отдельный пересчет не нужен.
+    Возвращает (число сборов, число платежей).
+    """
+    rng = random.Random(seed)
+    pools = _fake_pools(seed)
+    created_collects = created_payments = 0
+    chunk = []
+    chunk_payments = 0
+
+    for author_id in author_ids:
+        for _ in range(collects_per_user):
+            target_amount = rng.randint(1000, 10000)
+            plan = _plan_payments(
+                rng, donator_ids, target_amount, max_payments
+            )
+            current_amount = sum(amount for _, amount, _ in plan)
+            collect = Collect(
+                author_id=author_id,
+                title=rng.choice(pools['title']),
+                description=rng.choice(pools['description']),
+                occasion=rng.choice(OCCASIONS),
+                target_amount=target_amount,
+                end_datetime=rng.choice(pools['end_datetime']),
+                current_amount=Decimal(current_amount),
+                payments_count=len(plan),
+                donators_count=len({donator for donator, _, _ in plan}),
+                is_completed=current_amount >= target_amount,
+            )
+            chunk.append((collect, plan))
+            chunk_payments += len(plan)
+
+            if chunk_payments >= batch_size:
+                collects, payments = _create_chunk(chunk, batch_size)
+                created_collects += collects
+                created_payments += payments
+                chunk = []
+                chunk_payments = 0
+
+    if chunk:
+        collects, payments = _create_chunk(chunk, batch_size)
+        created_collects += collects
+        created_payments += payments
+    return created_collects, created_payments
+
+
+def _generate_collects_worker(args):
+    """Точка входа процесса-воркера: у каждого свое соединение с БД."""
+    connections.close_all()
+    return generate_collects(*args)
 
 
 class Command(BaseCommand):
@@ -33,88 +181,112 @@ class Command(BaseCommand):
             '--payments',
             type=int,
             default=20,
-            help='Количество платежей на пользователя',
+            help='Максимальное количество платежей на сбор',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество строк в одной пачке bulk_create',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Количество процессов для генерации сборов и платежей',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Начальное значение генератора случайных чисел',
         )
 
     def handle(self, *args, **options):
         self.stdout.write('Создание тестовых данных')
+        batch_size = options['batch_size']
+        seed = options['seed']
+        started = time.monotonic()
 
-        with transaction.atomic():
-            users_to_create = []
-            for i in range(options['users']):
-                user = User(
-                    username=fake.user_name()[:30],
-                    email=fake.email(),
-                    first_name=fake.first_name(),
-                    last_name=fake.last_name()
-                )
-                users_to_create.append(user)
+        user_ids = self._create_users(options['users'], batch_size, seed)
+        self._report('пользователей', len(user_ids), started)
 
-            users = User.objects.bulk_create(users_to_create)
-            self.stdout.write(f'Создано пользователей: {len(users)}')
+        started_collects = time.monotonic()
+        collects, payments = self._create_collects(user_ids, options)
+        self._report('сборов', collects, started_collects)
+        self._report('платежей', payments, started_collects)
 
-            for user in users:
-                user.set_password('verystrongpass999')
-                user.save(update_fields=['password'])
-
-            occasions = [
-                'birthday', 'wedding', 'charity',
-                'medicine', 'education', 'other'
-            ]
-            collects_to_create = []
-            for user in users:
-                for i in range(options['collects']):
-                    collect = Collect(
-                        author=user,
-                        title=fake.sentence(nb_words=4)[:35],
-                        description=fake.text(max_nb_chars=200),
-                        occasion=random.choice(occasions),
-                        target_amount=random.randint(1000, 10000),
-                        end_datetime=fake.future_datetime(end_date='+30d'),
-                        is_completed=False
-                    )
-                    collects_to_create.append(collect)
-
-            collects = Collect.objects.bulk_create(collects_to_create)
-            self.stdout.write(f'Создано сборов: {len(collects)}')
-
-            payments_to_create = []
-            for collect in collects:
-                payments_count = random.randint(1, options['payments'])
-                current_total = 0
-
-                for i in range(payments_count):
-                    donator = random.choice(users)
-                    amount = random.randint(100, 1000)
-
-                    if (
-                        collect.target_amount is not None and
-                        current_total + amount > collect.target_amount
-                    ):
-                        amount = collect.target_amount - current_total
-                        payments_to_create.append(
-                            Payment(
-                                collect=collect,
-                                donator=donator,
-                                amount=amount,
-                                hide_amount=random.choice([True, False])
-                            )
-                        )
-                        break
-
-                    payments_to_create.append(
-                        Payment(
-                            collect=collect,
-                            donator=donator,
-                            amount=amount,
-                            hide_amount=random.choice([True, False])
-                        )
-                    )
-                    current_total += amount
-
-            payments = Payment.objects.bulk_create(payments_to_create)
-            self.stdout.write(f'Создано платежей: {len(payments)}')
+        # Суточные итоги считаются одним запросом после вставки:
+        # процессы-воркеры писали бы в одни и те же строки.
+        days = rebuild_daily_stats(batch_size)
+        self.stdout.write(f'Записано суточных итогов поводов: {days}')
 
+        total_rows = len(user_ids) + collects + payments
+        self._report('строк всего', total_rows, started)
         self.stdout.write(
             self.style.SUCCESS('БД успешно заполнена тестовыми данными.')
         )
+
+    def _report(self, name, count, started):
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(
+            f'Создано {name}: {count} '
+            f'за {elapsed:.1f} с ({count / elapsed:.0f} строк/с)'
+        )
+
+    def _create_users(self, count, batch_size, seed):
+        """Создает пользователей пачками с одним хэшем пароля на всех."""
+        rng = random.Random(seed)
+        pools = _fake_pools(seed)
+        # PBKDF2 считается один раз, а не для каждого пользователя.
+        password = make_password(DEFAULT_PASSWORD)
+        # Смещение делает имена уникальными при повторных запусках.
+        offset = User.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        user_ids = []
+
+        for start in range(0, count, batch_size):
+            users = [
+                User(
+                    username=f'{rng.choice(pools["username"])}_{offset + i}',
+                    email=f'user{offset + i}@example.com',
+                    first_name=rng.choice(pools['first_name']),
+                    last_name=rng.choice(pools['last_name']),
+                    password=password,
+                )
+                for i in range(start, min(start + batch_size, count))
+            ]
+            user_ids.extend(
+                user.pk for user in User.objects.bulk_create(users)
+            )
+        return user_ids
+
+    def _create_collects(self, user_ids, options):
+        """Создает сборы и платежи в одном или нескольких процессах."""
+        workers = max(1, min(options['workers'], len(user_ids)))
+        tasks = [
+            (
+                user_ids[index::workers],
+                user_ids,
+                options['collects'],
+                options['payments'],
+                options['batch_size'],
+                options['seed'] + index,
+            )
+            for index in range(workers)
+        ]
+
+        if workers == 1:
+            results = [generate_collects(*tasks[0])]
+        else:
+            # Дочерние процессы не должны наследовать открытые соединения.
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with context.Pool(workers) as pool:
+                results = pool.map(_generate_collects_worker, tasks)
+
+        return (
+            sum(collects for collects, _ in results),
+            sum(payments for _, payments in results),
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from collects.totals import rebuild_daily_stats, reconcile_totals
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает статистику по таблице платежей: итоги сборов, '
+        'суммы донатеров сборов и суточные итоги поводов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество сборов или записей за один проход',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        drifted = reconcile_totals(batch_size=batch_size)
+        self.stdout.write(
+            f'Исправлено итогов и рейтингов сборов: {len(drifted)}'
+        )
+        days = rebuild_daily_stats(batch_size=batch_size)
+        self.stdout.write(f'Записано суточных итогов поводов: {days}')
+        self.stdout.write(self.style.SUCCESS('Статистика пересчитана.'))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from collects.totals import reconcile_totals
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет накопленные итоги сборов с платежами '
+        'и исправляет расхождения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--collect',
+            type=int,
+            action='append',
+            dest='collect_ids',
+            help='Идентификатор сбора для проверки (можно указать несколько)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество сборов, проверяемых за один проход',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать расхождения, не исправляя их',
+        )
+
+    def handle(self, *args, **options):
+        drifted = reconcile_totals(
+            collect_ids=options['collect_ids'],
+            repair=not options['dry_run'],
+            batch_size=options['batch_size'],
+        )
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('Расхождений не найдено.'))
+            return
+
+        self.stdout.write(
+            f'Сборы с расхождениями: {", ".join(map(str, drifted))}'
+        )
+        if options['dry_run']:
+            self.stdout.write(
+                self.style.WARNING(f'Найдено расхождений: {len(drifted)}')
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f'Исправлено сборов: {len(drifted)}')
+            )
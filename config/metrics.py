@@ -0,0 +1,215 @@
+import logging
+import threading
+import time
+import traceback
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from rest_framework.serializers import BaseSerializer
+
+
+logger = logging.getLogger('slow_queries')
+
+_current = ContextVar('request_metrics', default=None)
+_registry = defaultdict(Counter)
+_registry_lock = threading.Lock()
+_instrumented = False
+
+# Счетчики Prometheus: (атрибут RequestMetrics, имя метрики, описание).
+PROMETHEUS_COUNTERS = (
+    ('requests', 'donut_requests_total', 'Количество запросов'),
+    ('duration', 'donut_request_seconds_total', 'Время обработки запросов'),
+    ('db_queries', 'donut_db_queries_total', 'Количество запросов к БД'),
+    ('db_time', 'donut_db_seconds_total', 'Время запросов к БД'),
+    ('slow_queries', 'donut_slow_queries_total', 'Медленные запросы к БД'),
+    ('cache_hits', 'donut_cache_hits_total', 'Попадания в кэш ответов'),
+    ('cache_misses', 'donut_cache_misses_total', 'Промахи кэша ответов'),
+    (
+        'serializer_time',
+        'donut_serializer_seconds_total',
+        'Время сериализации ответов',
+    ),
+)
+
+
+class RequestMetrics:
+    """Метрики производительности одного запроса."""
+
+    def __init__(self, request):
+        self.request = request
+        self.requests = 1
+        self.duration = 0.0
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.slow_queries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.serializer_time = 0.0
+        self._serializing = False
+
+    @contextmanager
+    def activate(self):
+        """Делает метрики текущими для кода, выполняющего запрос."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    @property
+    def view(self):
+        """Имя представления, определенное по разрешенному URL."""
+        match = getattr(self.request, 'resolver_match', None)
+        if match is None:
+            return 'unresolved'
+        return view_name(match.func, self.request.method)
+
+    def execute(self, execute, sql, params, many, context):
+        """Обертка connection.execute_wrapper: время и число запросов."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.db_queries += 1
+            self.db_time += duration
+            if duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+                self.slow_queries += 1
+                logger.warning(
+                    'Медленный запрос %.1f мс в %s (%s): %s',
+                    duration * 1000, self.view, _call_site(), sql,
+                )
+
+    def server_timing(self):
+        """Значение заголовка Server-Timing."""
+        return ', '.join([
+            f'app;dur={self.duration * 1000:.1f}',
+            f'db;dur={self.db_time * 1000:.1f};'
+            f'desc="{self.db_queries} queries"',
+            f'serializer;dur={self.serializer_time * 1000:.1f}',
+            f'cache;desc="{self.cache_hits} hits, '
+            f'{self.cache_misses} misses"',
+        ])
+
+
+def _record_query(execute, sql, params, many, context):
+    """Обертка запросов соединения: учитывает их в метриках запроса."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.execute(execute, sql, params, many, context)
+
+
+def instrument_connection(connection, **kwargs):
+    """
+    Подключает учет запросов к соединению с БД.
+    Обертка постоянная, а метрики берутся из контекста запроса,
+    поэтому запросы учитываются и в потоках sync_to_async под ASGI.
+    """
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def record_cache(outcome):
+    """Учитывает попадание или промах кэша в метриках запроса."""
+    metrics = _current.get()
+    if metrics is None:
+        return
+    if outcome == 'hits':
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+@contextmanager
+def track_serializer():
+    """Учитывает время сериализации; вложенные вызовы не суммируются."""
+    metrics = _current.get()
+    if metrics is None or metrics._serializing:
+        yield
+        return
+    metrics._serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_time += time.perf_counter() - started
+        metrics._serializing = False
+
+
+def instrument_serializers():
+    """
+    Оборачивает BaseSerializer.data замером времени.
+    Serializer.data и ListSerializer.data вызывают его через super(),
+    поэтому учитываются все сериализаторы DRF.
+    """
+    global _instrumented
+    if _instrumented:
+        return
+    data = BaseSerializer.data
+
+    def timed_data(self):
+        with track_serializer():
+            return data.fget(self)
+
+    BaseSerializer.data = property(timed_data)
+    _instrumented = True
+
+
+def _call_site():
+    """Ближайший к запросу кадр стека из кода проекта."""
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        path = frame.filename
+        if (
+            path.startswith(base_dir)
+            and 'site-packages' not in path
+            and path != __file__
+        ):
+            relative = Path(path).relative_to(base_dir)
+            return f'{relative}:{frame.lineno} in {frame.name}'
+    return 'unknown'
+
+
+def view_name(view_func, method):
+    """Имя представления для метрик: CollectViewSet.list и т.п."""
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return f'{view_func.__module__}.{view_func.__qualname__}'
+    actions = getattr(view_func, 'actions', None) or {}
+    handler = actions.get(method.lower(), method.lower())
+    return f'{view_class.__name__}.{handler}'
+
+
+def observe(metrics):
+    """Добавляет метрики завершенного запроса в счетчики процесса."""
+    with _registry_lock:
+        counters = _registry[metrics.view]
+        for attribute, _, _ in PROMETHEUS_COUNTERS:
+            counters[attribute] += getattr(metrics, attribute)
+
+
+def _label(value):
+    return (
+        value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    )
+
+
+def render_prometheus():
+    """
+    Счетчики процесса в текстовом формате Prometheus.
+    Значения копятся в памяти процесса с момента запуска.
+    """
+    with _registry_lock:
+        snapshot = {view: dict(values) for view, values in _registry.items()}
+    lines = []
+    for attribute, name, description in PROMETHEUS_COUNTERS:
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} counter')
+        for view, values in sorted(snapshot.items()):
+            value = values.get(attribute, 0)
+            lines.append(f'{name}{{view="{_label(view)}"}} {value}')
+    return '\n'.join(lines) + '\n'
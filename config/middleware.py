@@ -0,0 +1,56 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from config.metrics import (
+    RequestMetrics,
+    instrument_connection,
+    instrument_serializers,
+    observe,
+)
+
+
+class PerformanceMiddleware:
+    """
+    Собирает метрики запроса: общее время, число и время запросов к БД,
+    попадания в кэш ответов и время сериализации.
+    Метрики отдаются в заголовке Server-Timing и копятся в счетчиках
+    процесса для эндпоинта /api/v1/metrics/.
+    Работает и под WSGI, и под ASGI без переключения потоков.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        instrument_serializers()
+        connection_created.connect(instrument_connection)
+        for connection in connections.all(initialized_only=True):
+            instrument_connection(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics(request)
+        started = time.perf_counter()
+        with metrics.activate():
+            response = self.get_response(request)
+        return self._finish(metrics, started, response)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics(request)
+        started = time.perf_counter()
+        with metrics.activate():
+            response = await self.get_response(request)
+        return self._finish(metrics, started, response)
+
+    def _finish(self, metrics, started, response):
+        metrics.duration = time.perf_counter() - started
+        observe(metrics)
+        response['Server-Timing'] = metrics.server_timing()
+        return response
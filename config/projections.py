@@ -0,0 +1,30 @@
+from decimal import Decimal
+
+from django.utils import timezone
+
+
+def decimal_value(value, decimal_places):
+    """Decimal как строка, как DecimalField DRF."""
+    if value is None:
+        return None
+    return f'{value.quantize(Decimal(1).scaleb(-decimal_places)):f}'
+
+
+def datetime_value(value):
+    """Дата и время в текущем часовом поясе, как DateTimeField DRF."""
+    if value is None:
+        return None
+    representation = timezone.localtime(value).isoformat()
+    if representation.endswith('+00:00'):
+        return representation[:-6] + 'Z'
+    return representation
+
+
+def file_url(field, name, request=None):
+    """URL файла по имени из values(), как FileField DRF."""
+    if not name:
+        return None
+    url = field.storage.url(name)
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
@@ -30,6 +30,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'config.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -111,8 +112,12 @@ AUTH_USER_MODEL = 'users.CustomUser'
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'config.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'config.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -139,6 +144,11 @@ LOGGING = {
             'class': 'logging.FileHandler',
             'filename': 'logs/payments.log',
         },
+        'slow_queries_file': {
+            'level': 'WARNING',
+            'class': 'logging.FileHandler',
+            'filename': 'logs/slow_queries.log',
+        },
     },
     'loggers': {
         'payments': {
@@ -146,6 +156,16 @@ LOGGING = {
             'level': 'INFO',
             'propagate': True,
         },
+        'collects_events': {
+            'handlers': ['console', 'file'],
+            'level': 'INFO',
+            'propagate': True,
+        },
+        'slow_queries': {
+            'handlers': ['console', 'slow_queries_file'],
+            'level': 'WARNING',
+            'propagate': True,
+        },
     },
 }
 
@@ -157,11 +177,43 @@ CACHES = {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
         },
         "KEY_PREFIX": "donut_tracker",
-    }
+    },
+    "sessions": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": os.getenv(
+            'REDIS_SESSIONS_URL', 'redis://redis:6379/2'
+        ),
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+        },
+        "KEY_PREFIX": "donut_tracker",
+    },
 }
 
 CACHE_TTL = 60 * 15
 
+# Время жизни пользователя токена в кэше аутентификации, в секундах.
+# Удаление токена и изменение пользователя сбрасывают запись сразу.
+AUTH_TOKEN_CACHE_TTL = int(os.getenv('AUTH_TOKEN_CACHE_TTL', '60'))
+
+# Сессии в Redis вместо таблицы django_session: SESSION_STORE=redis.
+# Кэш sessions в отдельной базе Redis: очистка кэша ответов
+# не завершает сессии пользователей.
+if os.getenv('SESSION_STORE', 'db') == 'redis':
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
+    SESSION_CACHE_ALIAS = 'sessions'
+
+# Локальный LRU-кэш процесса перед Redis для горячих карточек сборов.
+# Сбросы рассылаются через Redis pub/sub, TTL ограничивает устаревание
+# при потере сообщения. 0 отключает локальный уровень.
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv('LOCAL_CACHE_MAX_ENTRIES', '1000'))
+LOCAL_CACHE_TTL = int(os.getenv('LOCAL_CACHE_TTL', '30'))
+
+# Запросы к БД дольше порога пишутся в logs/slow_queries.log.
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '200'))
+
+PAYMENTS_BULK_MAX_SIZE = int(os.getenv('PAYMENTS_BULK_MAX_SIZE', '5000'))
+
 
 CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://redis:6379/0')
 CELERY_RESULT_BACKEND = os.environ.get(
@@ -170,3 +222,48 @@ CELERY_RESULT_BACKEND = os.environ.get(
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Yekaterinburg'
+CELERY_BEAT_SCHEDULE = {
+    'flush-donation-notifications': {
+        'task': 'payments.tasks.flush_donation_notifications',
+        'schedule': 10.0,
+    },
+    'complete-expired-collects': {
+        'task': 'collects.tasks.complete_expired_collects',
+        'schedule': 60.0,
+    },
+    'archive-completed-payments': {
+        'task': 'payments.tasks.archive_completed_payments',
+        'schedule': 60.0 * 60,
+    },
+}
+
+# Уведомления о платежах копятся в списке Redis и разбираются
+# периодической задачей пачками.
+PAYMENT_NOTIFICATIONS_BUFFERED = (
+    os.getenv('PAYMENT_NOTIFICATIONS_BUFFERED', 'True').lower() == 'true'
+)
+PAYMENT_NOTIFICATIONS_KEY = 'donut_tracker:payments:notifications'
+PAYMENT_NOTIFICATIONS_BATCH_SIZE = 500
+PAYMENT_NOTIFICATIONS_MAX_BATCHES = 100
+
+# Прогресс сборов публикуется в Redis pub/sub для SSE-потоков.
+COLLECT_PROGRESS_PUBLISH = (
+    os.getenv('COLLECT_PROGRESS_PUBLISH', 'True').lower() == 'true'
+)
+# Интервал пингов SSE-потока без обновлений, в секундах.
+COLLECT_PROGRESS_HEARTBEAT = 15
+
+# Количество сборов, закрываемых одним UPDATE.
+COLLECTS_COMPLETION_BATCH_SIZE = 5000
+
+# Платежи сборов, завершенных раньше указанного числа дней,
+# переносятся в архивную таблицу пачками сборов; платежи пачки
+# копируются одним INSERT ... SELECT на стороне БД.
+PAYMENTS_ARCHIVE_AFTER_DAYS = int(
+    os.getenv('PAYMENTS_ARCHIVE_AFTER_DAYS', '90')
+)
+PAYMENTS_ARCHIVE_BATCH_SIZE = 100
+
+# Списки админки без фильтров берут число строк из статистики PostgreSQL,
+# если в таблице не меньше строк, чем указано.
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100000
@@ -4,7 +4,12 @@ from config.settings import * # noqa
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': ':memory:',  # Используем in-memory базу для тестов
+        'NAME': ':memory:',
+        # Тестовая база в файле: in-memory база с общим кэшем не ждет
+        # блокировок и ломает тесты с параллельными потоками.
+        # IMMEDIATE сразу берет блокировку на запись, как строки в Postgres.
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 20},
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},  # noqa: F405
     }
 }
 
@@ -12,4 +17,20 @@ CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
     }
-}
\ No newline at end of file
+}
+
+# В тестах нет Redis: уведомления отправляются задачей без буфера.
+PAYMENT_NOTIFICATIONS_BUFFERED = False
+COLLECT_PROGRESS_PUBLISH = False
+# Без фиксации транзакций в тестах локальный кэш не сбрасывается.
+LOCAL_CACHE_MAX_ENTRIES = 0
+# Тесты не пишут в файлы логов в logs/: записи по-прежнему
+# доступны через caplog и консоль.
+LOGGING = {
+    **LOGGING,  # noqa: F405
+    'handlers': {
+        **LOGGING['handlers'],  # noqa: F405
+        'file': {'class': 'logging.NullHandler'},
+        'slow_queries_file': {'class': 'logging.NullHandler'},
+    },
+}
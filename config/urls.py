@@ -6,6 +6,8 @@ from drf_spectacular.views import (
 )
 from rest_framework.authtoken import views as drf_views
 
+from config.views import MetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path(
@@ -13,6 +15,7 @@ urlpatterns = [
         drf_views.obtain_auth_token,
         name='api-token-auth',
     ),
+    path('api/v1/metrics/', MetricsView.as_view(), name='metrics'),
     path('api/v1/', include('payments.urls')),
     path('api/v1/', include('collects.urls')),
     path('api/v1/schema/', SpectacularAPIView.as_view(), name='schema'),
@@ -0,0 +1,29 @@
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from config.cache_utils import render_cache_metrics
+from config.metrics import render_prometheus
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Отдает готовый текст в формате Prometheus."""
+
+    media_type = 'text/plain'
+    format = 'txt'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data.encode(self.charset)
+
+
+class MetricsView(APIView):
+    """Счетчики производительности процесса в формате Prometheus."""
+
+    permission_classes = [IsAdminUser]
+    renderer_classes = [PrometheusRenderer]
+    schema = None
+
+    def get(self, request):
+        return Response(render_prometheus() + render_cache_metrics())
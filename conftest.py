@@ -1,5 +1,8 @@
+from datetime import timedelta
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from rest_framework.test import APIClient
 from model_bakery import baker
 
@@ -34,7 +37,12 @@ def another_user(db):
 @pytest.fixture
 def collect(db, user):
     """Фикстура для создания тестового сбора средств."""
-    return baker.make('collects.Collect', author=user, target_amount=10000)
+    return baker.make(
+        'collects.Collect',
+        author=user,
+        target_amount=10000,
+        end_datetime=timezone.now() + timedelta(days=30),
+    )
 
 
 @pytest.fixture
@@ -1,15 +1,48 @@
 from django.contrib import admin
 
-from payments.models import Payment
+from config.admin import LargeTableAdminMixin
+from payments.models import ArchivedPayment, Payment
 
 
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
+class PaymentAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = (
         'donator', 'collect', 'amount',
         'payment_datetime', 'hide_amount'
     )
+    list_select_related = ('donator', 'collect')
     list_filter = ('payment_datetime', 'hide_amount')
     search_fields = ('donator__username', 'collect__title')
+    autocomplete_fields = ('collect', 'donator')
     readonly_fields = ('payment_datetime',)
-    date_hierarchy = 'payment_datetime'
+
+    def get_readonly_fields(self, request, obj=None):
+        """
+        Итоги сбора учитывают платеж только при создании,
+        поэтому сбор, донатер и сумма сохраненного платежа не меняются.
+        """
+        if obj is None:
+            return self.readonly_fields
+        return (*self.readonly_fields, 'collect', 'donator', 'amount')
+
+
+@admin.register(ArchivedPayment)
+class ArchivedPaymentAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    """Архив только для просмотра: итоги сборов заморожены."""
+
+    list_display = (
+        'id', 'donator', 'collect', 'amount',
+        'payment_datetime', 'archived_at'
+    )
+    list_select_related = ('donator', 'collect')
+    list_filter = ('payment_datetime',)
+    search_fields = ('donator__username', 'collect__title')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,127 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from collects.models import Collect
+from config.cache_utils import invalidate_collects, invalidate_users_payments
+from payments.models import ArchivedPayment, Payment
+
+
+ARCHIVED_PAYMENT_FIELDS = (
+    'id', 'collect_id', 'donator_id', 'amount',
+    'payment_datetime', 'hide_amount',
+)
+
+
+def collect_payments(collect_id, payments_archived_at):
+    """
+    Платежи сбора: из архива, если они туда перенесены
+    (payments_archived_at сбора задан), иначе из основной таблицы.
+    """
+    model = ArchivedPayment if payments_archived_at else Payment
+    return model.objects.filter(collect_id=collect_id)
+
+
+def archivable_collects(now, days):
+    """
+    Завершенные сборы, закрытые для платежей более days дней назад,
+    платежи которых еще в основной таблице.
+    После даты окончания сбор не принимает платежи, поэтому она
+    служит нижней границей времени его закрытия.
+    """
+    return Collect.objects.filter(
+        is_completed=True,
+        end_datetime__lte=now - timedelta(days=days),
+        payments_archived_at__isnull=True,
+    )
+
+
+def _copy_to_archive(collect_ids, now):
+    """
+    Копирует платежи сборов в архив одним INSERT ... SELECT:
+    строки не проходят через память процесса, сколько бы платежей
+    ни было у сборов пачки. Возвращает число скопированных платежей.
+    """
+    connection = connections[Payment.objects.db]
+    quote = connection.ops.quote_name
+
+    def columns(model, names):
+        return ', '.join(
+            quote(model._meta.get_field(name).column) for name in names
+        )
+
+    placeholders = ', '.join(['%s'] * len(collect_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(ArchivedPayment._meta.db_table)} '
+            f'({columns(ArchivedPayment, ARCHIVED_PAYMENT_FIELDS)}, '
+            f'{columns(ArchivedPayment, ["archived_at"])}) '
+            f'SELECT {columns(Payment, ARCHIVED_PAYMENT_FIELDS)}, %s '
+            f'FROM {quote(Payment._meta.db_table)} '
+            f'WHERE {columns(Payment, ["collect_id"])} IN ({placeholders})',
+            [connection.ops.adapt_datetimefield_value(now), *collect_ids],
+        )
+        return cursor.rowcount
+
+
+def _archive_batch(collect_ids, now):
+    """
+    Переносит платежи пачки сборов в архив одной транзакцией.
+    Итоги сборов, реестр донатеров и суточные итоги не меняются:
+    они остаются замороженными на момент переноса.
+    Возвращает число перенесенных платежей.
+    """
+    with transaction.atomic():
+        # Сборы, которые успел перенести параллельный запуск, пропускаем.
+        collect_ids = list(
+            Collect.objects.select_for_update()
+            .filter(pk__in=collect_ids, payments_archived_at__isnull=True)
+            .values_list('pk', flat=True)
+        )
+        if not collect_ids:
+            return 0
+        payments = Payment.objects.filter(collect_id__in=collect_ids)
+        donator_ids = list(
+            payments.order_by()
+            .values_list('donator_id', flat=True)
+            .distinct()
+        )
+        moved = _copy_to_archive(collect_ids, now)
+        # Удаление одним DELETE без сигналов post_delete:
+        # обработчик вычел бы платежи из итогов сбора.
+        payments._raw_delete(payments.db)
+        Collect.objects.filter(pk__in=collect_ids).update(
+            payments_archived_at=now
+        )
+
+        def notify():
+            invalidate_collects(collect_ids)
+            invalidate_users_payments(donator_ids)
+
+        transaction.on_commit(notify)
+    return moved
+
+
+def archive_payments(now=None, days=None, batch_size=None):
+    """
+    Переносит платежи завершенных сборов старше days дней в архив.
+    Сборы обрабатываются пачками по batch_size короткими
+    транзакциями; перенесенные сборы выпадают из выборки,
+    поэтому пачки идут без смещения.
+    Возвращает число перенесенных сборов и платежей.
+    """
+    now = now or timezone.now()
+    days = settings.PAYMENTS_ARCHIVE_AFTER_DAYS if days is None else days
+    batch_size = batch_size or settings.PAYMENTS_ARCHIVE_BATCH_SIZE
+    queryset = archivable_collects(now, days).order_by('pk')
+
+    collects = payments = 0
+    while True:
+        collect_ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not collect_ids:
+            break
+        payments += _archive_batch(collect_ids, now)
+        collects += len(collect_ids)
+    return collects, payments
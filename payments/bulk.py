@@ -0,0 +1,156 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from collects.constants import (
+    AMOUNT_DECIMAL_PLACES,
+    AMOUNT_MAX_DIGITS,
+    MIN_PAYMENT_AMOUNT,
+)
+from collects.models import Collect
+from collects.progress import publish_progress
+from collects.totals import CollectCapacityError, apply_payments
+from config.cache_utils import invalidate_collect, invalidate_user_payments
+from payments.models import Payment
+from payments.tasks import enqueue_donation_notifications
+
+
+class PaymentBulkItemSerializer(serializers.Serializer):
+    """
+    Сериализатор элемента пакетной загрузки платежей.
+    Сбор передается идентификатором и проверяется для всей пачки сразу.
+    """
+
+    collect = serializers.IntegerField()
+    amount = serializers.DecimalField(
+        max_digits=AMOUNT_MAX_DIGITS,
+        decimal_places=AMOUNT_DECIMAL_PLACES,
+        min_value=MIN_PAYMENT_AMOUNT,
+    )
+    hide_amount = serializers.BooleanField(default=False)
+
+
+def _rejected(index, errors):
+    """Результат для отклоненного элемента пачки."""
+    return {'index': index, 'status': 'rejected', 'errors': errors}
+
+
+def _admit_items(items, collects):
+    """
+    Распределяет элементы по сборам и проверяет остаток каждого сбора.
+    Возвращает словарь {collect_id: [(index, data), ...]} с принятыми
+    элементами и словарь отклоненных результатов по индексу.
+    """
+    accepted = defaultdict(list)
+    rejected = {}
+    reserved = defaultdict(int)
+    now = timezone.now()
+
+    for index, data in items:
+        collect = collects.get(data['collect'])
+        if collect is None:
+            rejected[index] = _rejected(
+                index, {'collect': ['Сбор не найден.']}
+            )
+            continue
+        if collect.is_completed or collect.end_datetime <= now:
+            rejected[index] = _rejected(index, {'collect': [
+                'Сбор уже завершен. Новые платежи не принимаются.'
+            ]})
+            continue
+        if collect.target_amount is not None:
+            remaining_amount = (
+                collect.target_amount - collect.current_amount
+                - reserved[collect.pk]
+            )
+            if data['amount'] > remaining_amount:
+                rejected[index] = _rejected(index, {'amount': [
+                    f'Сумма платежа ({data["amount"]}) превышает '
+                    f'оставшуюся сумму сбора. Максимально можно внести: '
+                    f'{remaining_amount}'
+                ]})
+                continue
+        reserved[collect.pk] += data['amount']
+        accepted[collect.pk].append((index, data))
+
+    return accepted, rejected
+
+
+def ingest_payments(raw_items, donator):
+    """
+    Пакетно создает платежи донатера.
+    Элементы проверяются по отдельности, остаток сбора резервируется
+    одним UPDATE на сбор, платежи вставляются через bulk_create,
+    а уведомление ставится в очередь одной задачей на всю пачку.
+    Возвращает результаты в порядке элементов запроса.
+    """
+    results = {}
+    valid_items = []
+    for index, raw_item in enumerate(raw_items):
+        serializer = PaymentBulkItemSerializer(data=raw_item)
+        if serializer.is_valid():
+            valid_items.append((index, serializer.validated_data))
+        else:
+            results[index] = _rejected(index, serializer.errors)
+
+    collects = Collect.objects.in_bulk(
+        {data['collect'] for _, data in valid_items}
+    )
+    accepted, rejected = _admit_items(valid_items, collects)
+    results.update(rejected)
+
+    created = []
+    with transaction.atomic():
+        for collect_id, collect_items in accepted.items():
+            payments = [
+                (index, Payment(
+                    collect_id=collect_id,
+                    donator=donator,
+                    amount=data['amount'],
+                    hide_amount=data['hide_amount'],
+                ))
+                for index, data in collect_items
+            ]
+            try:
+                with transaction.atomic():
+                    apply_payments(
+                        collect_id, [payment for _, payment in payments]
+                    )
+            except CollectCapacityError as error:
+                # Остаток сбора изменился параллельным платежом.
+                for index, _ in payments:
+                    results[index] = _rejected(
+                        index, {error.field: [str(error)]}
+                    )
+                continue
+            created.extend(payments)
+
+        Payment.objects.bulk_create([payment for _, payment in created])
+
+        if created:
+            collect_ids = {payment.collect_id for _, payment in created}
+            transaction.on_commit(
+                lambda: _invalidate_caches(collect_ids, donator.pk)
+            )
+            enqueue_donation_notifications(
+                payment.pk for _, payment in created
+            )
+
+    for index, payment in created:
+        results[index] = {
+            'index': index, 'status': 'created', 'id': payment.pk
+        }
+    return [results[index] for index in sorted(results)]
+
+
+def _invalidate_caches(collect_ids, donator_id):
+    """
+    Сбрасывает кэш затронутых сборов и платежей донатера
+    и публикует новый прогресс сборов.
+    """
+    for collect_id in collect_ids:
+        invalidate_collect(collect_id)
+    invalidate_user_payments(donator_id)
+    publish_progress(collect_ids)
@@ -0,0 +1,35 @@
+from collects.models import Collect
+from payments.archive import collect_payments
+from payments.models import ArchivedPayment, Payment
+
+
+PAYMENT_EXPORT_FIELDS = (
+    ('id', 'id'),
+    ('collect_id', 'collect_id'),
+    ('collect_title', 'collect__title'),
+    ('donator_id', 'donator_id'),
+    ('donator_username', 'donator__username'),
+    ('amount', 'amount'),
+    ('payment_datetime', 'payment_datetime'),
+    ('hide_amount', 'hide_amount'),
+)
+
+
+def payments_for_export(collect_id=None, donator_id=None, archived=False):
+    """
+    Платежи для выгрузки с фильтрами по сбору и донатеру.
+    Для сбора таблица выбирается сама: архив, если его платежи
+    перенесены. Без сбора archived выгружает архив вместо
+    основной таблицы.
+    """
+    if collect_id is not None:
+        payments_archived_at = Collect.objects.filter(
+            pk=collect_id
+        ).values_list('payments_archived_at', flat=True).first()
+        queryset = collect_payments(collect_id, payments_archived_at)
+    else:
+        model = ArchivedPayment if archived else Payment
+        queryset = model.objects.all()
+    if donator_id is not None:
+        queryset = queryset.filter(donator_id=donator_id)
+    return queryset
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collects', '0005_query_indexes'),
+        ('payments', '0002_alter_payment_donator'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='collect',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='payments', to='collects.collect', verbose_name='Сбор'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='donator',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='donations', to=settings.AUTH_USER_MODEL, verbose_name='Донатер'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['donator', '-payment_datetime'], name='payment_donator_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['collect', '-payment_datetime'], name='payment_collect_date_idx'),
+        ),
+    ]
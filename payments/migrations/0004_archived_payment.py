@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collects', '0007_collect_payments_archived_at'),
+        ('payments', '0003_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPayment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Сумма платежа')),
+                ('payment_datetime', models.DateTimeField(verbose_name='Дата и время платежа')),
+                ('hide_amount', models.BooleanField(default=False, verbose_name='Скрыть сумму в ленте')),
+                ('archived_at', models.DateTimeField(verbose_name='Дата переноса в архив')),
+                ('collect', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='archived_payments', to='collects.collect', verbose_name='Сбор')),
+                ('donator', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='archived_donations', to=settings.AUTH_USER_MODEL, verbose_name='Донатер')),
+            ],
+            options={
+                'verbose_name': 'Архивный платёж',
+                'verbose_name_plural': 'Архивные платежи',
+                'ordering': ['-payment_datetime'],
+                'indexes': [models.Index(fields=['donator', '-payment_datetime'], name='archived_payment_donator_idx'), models.Index(fields=['collect', '-payment_datetime'], name='archived_payment_collect_idx')],
+            },
+        ),
+    ]
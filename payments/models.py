@@ -20,12 +20,16 @@ class Payment(models.Model):
         on_delete=models.PROTECT,
         related_name='payments',
         verbose_name='Сбор',
+        # Покрывается составным индексом payment_collect_date_idx.
+        db_index=False,
     )
     donator = models.ForeignKey(
         User,
         on_delete=models.PROTECT,
         related_name='donations',
         verbose_name='Донатер',
+        # Покрывается составным индексом payment_donator_date_idx.
+        db_index=False,
     )
     amount = models.DecimalField(
         max_digits=AMOUNT_MAX_DIGITS,
@@ -42,10 +46,29 @@ class Payment(models.Model):
     )
 
     def clean(self):
-        """Валидация в модели для админки."""
+        """
+        Валидация в модели для админки.
+        Остаток считается по накопленным итогам сбора, уже загруженного
+        формой, без запросов к платежам. Окончательно сумму проверяет
+        условный UPDATE итогов при сохранении.
+        """
 
         super().clean()
 
+        # Сохраненный платеж уже учтен в итогах, а без сбора или суммы
+        # ошибку покажет само поле формы.
+        if (
+            self.pk is not None
+            or self.collect_id is None
+            or self.amount is None
+        ):
+            return
+
+        if self.collect.is_completed:
+            raise ValidationError(
+                'Сбор уже завершен. Новые платежи не принимаются.'
+            )
+
         if self.collect.target_amount is not None:
             remaining_amount = (
                 self.collect.target_amount - self.collect.current_amount
@@ -67,3 +90,74 @@ class Payment(models.Model):
         verbose_name = 'Платёж'
         verbose_name_plural = 'Платежи'
         ordering = ['-payment_datetime']
+        indexes = [
+            # Список платежей пользователя, в том числе по сбору.
+            models.Index(
+                fields=['donator', '-payment_datetime'],
+                name='payment_donator_date_idx',
+            ),
+            # Платежи сбора и агрегаты по сбору.
+            models.Index(
+                fields=['collect', '-payment_datetime'],
+                name='payment_collect_date_idx',
+            ),
+        ]
+
+
+class ArchivedPayment(models.Model):
+    """
+    Платеж завершенного сбора, перенесенный из таблицы платежей.
+    Сохраняет идентификатор и поля исходного платежа. Итоги сбора
+    после переноса не пересчитываются, поэтому архив только для чтения.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    collect = models.ForeignKey(
+        Collect,
+        on_delete=models.PROTECT,
+        related_name='archived_payments',
+        verbose_name='Сбор',
+        # Покрывается составным индексом archived_payment_collect_idx.
+        db_index=False,
+    )
+    donator = models.ForeignKey(
+        User,
+        on_delete=models.PROTECT,
+        related_name='archived_donations',
+        verbose_name='Донатер',
+        # Покрывается составным индексом archived_payment_donator_idx.
+        db_index=False,
+    )
+    amount = models.DecimalField(
+        max_digits=AMOUNT_MAX_DIGITS,
+        decimal_places=AMOUNT_DECIMAL_PLACES,
+        verbose_name='Сумма платежа',
+    )
+    payment_datetime = models.DateTimeField(
+        verbose_name='Дата и время платежа',
+    )
+    hide_amount = models.BooleanField(
+        default=False,
+        verbose_name='Скрыть сумму в ленте',
+    )
+    archived_at = models.DateTimeField(
+        verbose_name='Дата переноса в архив',
+    )
+
+    def __str__(self):
+        return f'Архивный платеж {self.id} на сумму {self.amount}'
+
+    class Meta:
+        verbose_name = 'Архивный платёж'
+        verbose_name_plural = 'Архивные платежи'
+        ordering = ['-payment_datetime']
+        indexes = [
+            models.Index(
+                fields=['donator', '-payment_datetime'],
+                name='archived_payment_donator_idx',
+            ),
+            models.Index(
+                fields=['collect', '-payment_datetime'],
+                name='archived_payment_collect_idx',
+            ),
+        ]
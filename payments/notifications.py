@@ -0,0 +1,39 @@
+import logging
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from payments.models import Payment
+
+
+logger = logging.getLogger('payments_events')
+
+
+def _buffer():
+    return get_redis_connection('default')
+
+
+def push_payment_ids(payment_ids):
+    """Добавляет идентификаторы платежей в буфер уведомлений в Redis."""
+    if payment_ids:
+        _buffer().rpush(settings.PAYMENT_NOTIFICATIONS_KEY, *payment_ids)
+
+
+def pop_payment_ids(count):
+    """Атомарно забирает из буфера до count идентификаторов платежей."""
+    payment_ids = _buffer().lpop(settings.PAYMENT_NOTIFICATIONS_KEY, count)
+    return [int(payment_id) for payment_id in payment_ids or []]
+
+
+def log_donations(payment_ids):
+    """Логирует пачку донатов одним запросом к БД."""
+    payments = Payment.objects.filter(id__in=payment_ids).select_related(
+        'collect'
+    ).only('id', 'amount', 'collect__title')
+    for payment in payments:
+        logger.info(
+            f"Новый взнос: Donation #{payment.id}, "
+            f"Сумма: {payment.amount}, "
+            f"Сбор: {payment.collect.title}"
+        )
+    return len(payments)
@@ -0,0 +1,10 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PaymentCursorPagination(CursorPagination):
+    """Курсорная пагинация платежей: от новых к старым."""
+
+    ordering = ('-payment_datetime', 'id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
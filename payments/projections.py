@@ -0,0 +1,51 @@
+from collects.constants import AMOUNT_DECIMAL_PLACES
+from config.metrics import track_serializer
+from config.projections import datetime_value, decimal_value
+
+
+# Поля values() для PaymentSerializer и PaymentShortSerializer.
+PAYMENT_VALUES = (
+    'id', 'collect_id', 'donator_id', 'donator__username',
+    'donator__first_name', 'donator__last_name', 'amount',
+    'payment_datetime', 'hide_amount',
+)
+PAYMENT_SHORT_VALUES = (
+    'id', 'donator__username', 'amount', 'payment_datetime', 'hide_amount',
+)
+
+
+def payment_items(rows):
+    """Платежи из строк values(), как PaymentSerializer(many=True)."""
+    with track_serializer():
+        return [
+            {
+                'id': row['id'],
+                'collect': row['collect_id'],
+                'donator': row['donator_id'],
+                'donator_details': {
+                    'id': row['donator_id'],
+                    'username': row['donator__username'],
+                    'first_name': row['donator__first_name'],
+                    'last_name': row['donator__last_name'],
+                },
+                'amount': decimal_value(row['amount'], AMOUNT_DECIMAL_PLACES),
+                'payment_datetime': datetime_value(row['payment_datetime']),
+                'hide_amount': row['hide_amount'],
+            }
+            for row in rows
+        ]
+
+
+def payment_short_items(rows):
+    """Платежи из строк values(), как PaymentShortSerializer(many=True)."""
+    with track_serializer():
+        return [
+            {
+                'id': row['id'],
+                'donator_username': row['donator__username'],
+                'amount': decimal_value(row['amount'], AMOUNT_DECIMAL_PLACES),
+                'payment_datetime': datetime_value(row['payment_datetime']),
+                'hide_amount': row['hide_amount'],
+            }
+            for row in rows
+        ]
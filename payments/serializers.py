@@ -1,7 +1,11 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Sum
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
+from collects.constants import MIN_PAYMENT_AMOUNT
+from collects.totals import CollectCapacityError
+from config.exports import ExportFormatSerializer
 from payments.models import Payment
 
 
@@ -51,21 +55,23 @@ class PaymentSerializer(serializers.ModelSerializer):
         read_only_fields = [
             'id', 'payment_datetime', 'donator_details', 'donator'
         ]
+        extra_kwargs = {'amount': {'min_value': MIN_PAYMENT_AMOUNT}}
 
     def validate(self, attrs):
         collect = attrs.get('collect')
         amount = attrs.get('amount')
 
-        if collect.is_completed:
+        # Истекший сбор закрывается периодической задачей,
+        # до ее запуска он уже не принимает платежи.
+        if collect.is_completed or collect.end_datetime <= timezone.now():
             raise serializers.ValidationError({
                 'collect': 'Сбор уже завершен. Новые платежи не принимаются.'
             })
 
+        # Предварительная проверка по сохраненной сумме. Окончательно
+        # остаток резервируется атомарно при сохранении платежа.
         if collect.target_amount is not None:
-            current_total = (
-                collect.payments.aggregate(total=Sum('amount'))['total'] or 0
-            )
-            remaining_amount = collect.target_amount - current_total
+            remaining_amount = collect.target_amount - collect.current_amount
 
             if amount > remaining_amount:
                 raise serializers.ValidationError({
@@ -78,4 +84,25 @@ class PaymentSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data['donator'] = self.context['request'].user
-        return super().create(validated_data)
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except CollectCapacityError as error:
+            raise serializers.ValidationError({error.field: str(error)})
+
+
+class PaymentExportParamsSerializer(ExportFormatSerializer):
+    """
+    Параметры выгрузки платежей: archived=true без collect_id
+    выгружает архив.
+    """
+
+    collect_id = serializers.IntegerField(required=False)
+    donator_id = serializers.IntegerField(required=False)
+    archived = serializers.BooleanField(default=False)
+
+
+class PaymentListParamsSerializer(serializers.Serializer):
+    """Параметры списка платежей: archived=true читает архив."""
+
+    archived = serializers.BooleanField(default=False)
@@ -1,12 +1,35 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from collects.progress import publish_progress
+from collects.totals import apply_payment, revert_payment
+from config.cache_utils import invalidate_collect, invalidate_user_payments
 from payments.models import Payment
-from payments.tasks import send_donation_email
+from payments.tasks import enqueue_donation_notifications
+
+
+def _invalidate_caches(payment):
+    """
+    Сбрасывает кэш сбора и списка платежей донатера
+    и публикует новый прогресс сбора.
+    """
+    invalidate_collect(payment.collect_id)
+    invalidate_user_payments(payment.donator_id)
+    publish_progress([payment.collect_id])
 
 
 @receiver(post_save, sender=Payment)
 def handle_new_payment(sender, instance, created, **kwargs):
     """Обработчик сигнала для логирования новых взносов."""
     if created:
-        send_donation_email.delay(instance.id)
+        apply_payment(instance)
+        transaction.on_commit(lambda: _invalidate_caches(instance))
+        enqueue_donation_notifications([instance.id])
+
+
+@receiver(post_delete, sender=Payment)
+def handle_deleted_payment(sender, instance, **kwargs):
+    """Обработчик сигнала для пересчета итогов сбора после удаления."""
+    revert_payment(instance)
+    transaction.on_commit(lambda: _invalidate_caches(instance))
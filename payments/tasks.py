@@ -1,8 +1,15 @@
 import logging
 
 from celery import shared_task
+from django.conf import settings
+from django.db import transaction
 
-from payments.models import Payment
+from payments.archive import archive_payments
+from payments.notifications import (
+    log_donations,
+    pop_payment_ids,
+    push_payment_ids,
+)
 
 
 logger = logging.getLogger('payments_events')
@@ -11,12 +18,58 @@ logger = logging.getLogger('payments_events')
 @shared_task
 def send_donation_email(payment_id):
     """Событие для логирования донатов."""
-    try:
-        payment = Payment.objects.get(id=payment_id)
-        logger.info(
-            f"Новый взнос: Donation #{payment.id}, "
-            f"Сумма: {payment.amount}, "
-            f"Сбор: {payment.collect.title}"
-        )
-    except Payment.DoesNotExist:
+    if not log_donations([payment_id]):
         logger.error(f"Взноса с id {payment_id} не существует!.")
+
+
+@shared_task
+def send_donation_emails(payment_ids):
+    """Событие для логирования пачки донатов одним запросом к БД."""
+    log_donations(payment_ids)
+
+
+@shared_task
+def flush_donation_notifications():
+    """
+    Периодическая задача: разбирает буфер уведомлений пачками.
+    Число пачек за запуск ограничено, остаток заберет следующий запуск.
+    """
+    batch_size = settings.PAYMENT_NOTIFICATIONS_BATCH_SIZE
+    flushed = 0
+    for _ in range(settings.PAYMENT_NOTIFICATIONS_MAX_BATCHES):
+        payment_ids = pop_payment_ids(batch_size)
+        if not payment_ids:
+            break
+        try:
+            log_donations(payment_ids)
+        except Exception:
+            # Возвращаем пачку в буфер, чтобы не потерять уведомления.
+            push_payment_ids(payment_ids)
+            raise
+        flushed += len(payment_ids)
+    return flushed
+
+
+@shared_task
+def archive_completed_payments():
+    """
+    Периодическая задача: переносит в архив платежи сборов,
+    завершенных более PAYMENTS_ARCHIVE_AFTER_DAYS дней назад.
+    """
+    return archive_payments()
+
+
+def enqueue_donation_notifications(payment_ids):
+    """
+    Ставит уведомления о платежах в очередь после фиксации транзакции,
+    чтобы обработчик не увидел еще не сохраненные платежи.
+    """
+    payment_ids = list(payment_ids)
+
+    def enqueue():
+        if settings.PAYMENT_NOTIFICATIONS_BUFFERED:
+            push_payment_ids(payment_ids)
+        else:
+            send_donation_emails.delay(payment_ids)
+
+    transaction.on_commit(enqueue)
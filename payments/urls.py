@@ -1,11 +1,16 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from payments.views import PaymentViewSet
+from payments.views import PaymentViewSet, async_payment_list
 
 router = DefaultRouter()
 router.register(r'payments', PaymentViewSet, basename='payment')
 
 urlpatterns = [
+    path(
+        'async/payments/',
+        async_payment_list,
+        name='payment-async-list',
+    ),
     path('', include(router.urls)),
 ]
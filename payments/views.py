@@ -1,14 +1,44 @@
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from rest_framework import viewsets
+from django.conf import settings
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
 from rest_framework.mixins import (
     CreateModelMixin, DestroyModelMixin, ListModelMixin
 )
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
 
-from payments.models import Payment
+from config.async_api import apaginate, async_api_view, authenticated_only
+from config.cache_utils import (
+    acache_response,
+    cache_response,
+    user_payments_versions,
+)
+from config.exports import streaming_export
+from payments.bulk import PaymentBulkItemSerializer, ingest_payments
+from payments.exports import PAYMENT_EXPORT_FIELDS, payments_for_export
+from payments.models import ArchivedPayment, Payment
+from payments.pagination import PaymentCursorPagination
 from payments.permissions import IsDonatorOrReadOnly
-from payments.serializers import PaymentSerializer
+from payments.projections import PAYMENT_VALUES, payment_items
+from payments.serializers import (
+    PaymentExportParamsSerializer,
+    PaymentListParamsSerializer,
+    PaymentSerializer,
+)
+
+
+def user_payments(user, collect_id=None, archived=False):
+    """
+    Платежи пользователя, при collect_id — только в этот сбор.
+    При archived — из архива платежей завершенных сборов.
+    """
+    model = ArchivedPayment if archived else Payment
+    queryset = model.objects.filter(donator=user).select_related('donator')
+
+    if collect_id:
+        return queryset.filter(collect_id=collect_id)
+
+    return queryset.order_by('-payment_datetime')
 
 
 class PaymentViewSet(
@@ -21,19 +51,96 @@ class PaymentViewSet(
 
     serializer_class = PaymentSerializer
     permission_classes = [IsDonatorOrReadOnly, IsAuthenticated]
+    pagination_class = PaymentCursorPagination
 
-    @method_decorator(cache_page(60 * 15))
+    @cache_response(user_payments_versions, vary_on_user=True)
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        params = PaymentListParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        queryset = user_payments(
+            request.user,
+            request.query_params.get('collect_id'),
+            archived=params.validated_data['archived'],
+        )
+        page = self.paginate_queryset(queryset.values(*PAYMENT_VALUES))
+        return self.get_paginated_response(payment_items(page))
 
     def get_queryset(self):
-        collect_id = self.request.query_params.get('collect_id')
-        queryset = Payment.objects.filter(donator=self.request.user)
-
-        if collect_id:
-            return queryset.filter(collect_id=collect_id)
-
-        return queryset.order_by('-payment_datetime')
+        return user_payments(
+            self.request.user, self.request.query_params.get('collect_id')
+        )
 
     def perform_create(self, serializer):
         serializer.save(donator=self.request.user)
+
+    @action(
+        detail=False,
+        methods=['post'],
+        serializer_class=PaymentBulkItemSerializer,
+    )
+    def bulk(self, request):
+        """Пакетное создание платежей с результатом по каждому элементу."""
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'detail': 'Ожидается непустой список платежей.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > settings.PAYMENTS_BULK_MAX_SIZE:
+            return Response(
+                {'detail': (
+                    f'Слишком много платежей в запросе. Максимум: '
+                    f'{settings.PAYMENTS_BULK_MAX_SIZE}'
+                )},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = ingest_payments(items, request.user)
+        created = sum(result['status'] == 'created' for result in results)
+        return Response({
+            'created': created,
+            'rejected': len(results) - created,
+            'results': results,
+        })
+
+    @action(
+        detail=False,
+        permission_classes=[IsAdminUser],
+        pagination_class=None,
+    )
+    def export(self, request):
+        """Потоковая выгрузка платежей в CSV или NDJSON."""
+        params = PaymentExportParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        queryset = payments_for_export(
+            collect_id=params.validated_data.get('collect_id'),
+            donator_id=params.validated_data.get('donator_id'),
+            archived=params.validated_data['archived'],
+        )
+        return streaming_export(
+            queryset,
+            PAYMENT_EXPORT_FIELDS,
+            params.validated_data['file_format'],
+            'payments',
+            request,
+        )
+
+
+@async_api_view
+@authenticated_only
+@acache_response(
+    'payment-async:list', user_payments_versions, vary_on_user=True
+)
+async def async_payment_list(request):
+    """Асинхронный список платежей, ответ как у PaymentViewSet.list."""
+    params = PaymentListParamsSerializer(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    queryset = user_payments(
+        request.user,
+        request.query_params.get('collect_id'),
+        archived=params.validated_data['archived'],
+    )
+    paginator, page = await apaginate(
+        PaymentCursorPagination, queryset.values(*PAYMENT_VALUES), request
+    )
+    return paginator.get_paginated_response(payment_items(page)).data
@@ -2,4 +2,4 @@ echo "Ожидаем готовности базы данных..."
 sleep 10
 
 python manage.py migrate
-python manage.py runserver 0.0.0.0:8000
\ No newline at end of file
+uvicorn config.asgi:application --host 0.0.0.0 --port 8000
\ No newline at end of file
@@ -1,15 +1,78 @@
+import asyncio
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from decimal import Decimal
 
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core import signals
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.db import close_old_connections, connection
 from django.db.models import Count, Sum
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from model_bakery import baker
+from PIL import Image
 from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
 
-from collects.models import Collect
-from collects.serializers import CollectSerializer
+from collects import tasks as collects_tasks
+from collects.covers import process_cover
+from collects.feed import (
+    ACTIVE_ONLY_ORDERINGS,
+    FEED_FILTERS,
+    FEED_ORDERINGS,
+    filter_feed,
+)
+from collects.models import Collect, CollectDonator, OccasionDailyStats
+from collects.progress import ProgressBroker, get_broker
+from payments import tasks
+from payments.models import ArchivedPayment, Payment
+from collects.projections import COLLECT_VALUES, collect_detail, collect_items
+from collects.serializers import CollectListSerializer, CollectSerializer
+from collects.totals import reconcile_totals
+from config import admin as config_admin
+from config import exports
+from config.authentication import AUTH_USER_FIELDS, user_cache_key
+from config.cache_utils import (
+    COLLECTS_LIST_GENERATION_KEY,
+    LOCAL_TIER,
+    get_cache_stats,
+    get_versions,
+)
+from config.local_cache import local_cache
+from config.renderers import FastJSONRenderer
+from payments.projections import (
+    PAYMENT_SHORT_VALUES,
+    PAYMENT_VALUES,
+    payment_items,
+)
 from payments.serializers import PaymentSerializer
 
+User = get_user_model()
+
+
+@pytest.fixture
+def locmem_cache(settings):
+    """Фикстура для включения реального кэша в памяти процесса."""
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+    # Хранилище LocMemCache общее для тестов: записи прошлых тестов
+    # могли остаться под теми же идентификаторами объектов.
+    cache.clear()
+
 
 def test_payment_creation(
         collect,
@@ -139,8 +202,8 @@ def test_list_only_own_payments(authenticated_client, user, another_user):
 
     response = authenticated_client.get('/api/v1/payments/')
     assert response.status_code == status.HTTP_200_OK
-    assert len(response.data) == 1
-    assert response.data[0]['amount'] == '1000.00'
+    assert len(response.data['results']) == 1
+    assert response.data['results'][0]['amount'] == '1000.00'
 
 
 def test_filter_payments_by_collect(authenticated_client, user):
@@ -155,8 +218,8 @@ def test_filter_payments_by_collect(authenticated_client, user):
         f'/api/v1/payments/?collect_id={collect1.id}'
     )
     assert response.status_code == status.HTTP_200_OK
-    assert len(response.data) == 1
-    assert response.data[0]['amount'] == '1000.00'
+    assert len(response.data['results']) == 1
+    assert response.data['results'][0]['amount'] == '1000.00'
 
 
 def test_unauthenticated_access(api_client):
@@ -193,6 +256,13 @@ def test_payment_serializer_amount_validation(collect, user):
     assert not serializer.is_valid()
     assert 'amount' in serializer.errors
 
+    for amount in (0, -10):
+        serializer = PaymentSerializer(
+            data={**data, 'amount': amount}, context={'request': None}
+        )
+        assert not serializer.is_valid()
+        assert 'amount' in serializer.errors
+
 
 def test_payment_hide_amount(authenticated_client, collect, user):
     """Проверка, что скрытие суммы платежа работает."""
@@ -227,3 +297,1310 @@ def test_create_payment_on_completed_collect(
     response = authenticated_client.post('/api/v1/payments/', data)
 
     assert response.status_code == 400
+
+
+def test_collect_totals_follow_payments(collect, user, another_user):
+    """Итоги сбора обновляются при создании и удалении платежей."""
+    first = baker.make(
+        'payments.Payment', collect=collect, donator=user, amount=1000
+    )
+    baker.make('payments.Payment', collect=collect, donator=user, amount=500)
+    baker.make(
+        'payments.Payment', collect=collect, donator=another_user, amount=200
+    )
+
+    collect.refresh_from_db()
+    assert collect.current_amount == 1700
+    assert collect.payments_count == 3
+    assert collect.donators_count == 2
+
+    first.delete()
+    collect.refresh_from_db()
+    assert collect.current_amount == 700
+    assert collect.payments_count == 2
+    assert collect.donators_count == 2
+    assert CollectDonator.objects.get(
+        collect=collect, donator=user
+    ).payments_count == 1
+
+
+def test_collect_donators_count_after_last_payment_deleted(collect, user):
+    """Донатер перестает учитываться после удаления всех его платежей."""
+    payment = baker.make(
+        'payments.Payment', collect=collect, donator=user, amount=1000
+    )
+    payment.delete()
+
+    collect.refresh_from_db()
+    assert collect.current_amount == 0
+    assert collect.donators_count == 0
+    assert not CollectDonator.objects.filter(collect=collect).exists()
+
+
+def test_reconcile_collect_totals_repairs_drift(collect, user, another_user):
+    """Команда сверки исправляет разошедшиеся итоги сбора."""
+    baker.make('payments.Payment', collect=collect, donator=user, amount=1000)
+    baker.make(
+        'payments.Payment', collect=collect, donator=another_user, amount=300
+    )
+    Collect.objects.filter(pk=collect.pk).update(
+        current_amount=5, payments_count=7, donators_count=0
+    )
+    CollectDonator.objects.filter(collect=collect).delete()
+
+    call_command('reconcile_collect_totals', '--dry-run')
+    collect.refresh_from_db()
+    assert collect.current_amount == 5
+
+    call_command('reconcile_collect_totals')
+    collect.refresh_from_db()
+    assert collect.current_amount == 1300
+    assert collect.payments_count == 2
+    assert collect.donators_count == 2
+    assert CollectDonator.objects.filter(collect=collect).count() == 2
+
+
+def test_collect_list_without_aggregation(api_client, collect, user):
+    """Список сборов отдает сохраненные итоги без агрегирующих запросов."""
+    baker.make('payments.Payment', collect=collect, donator=user, amount=1000)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get('/api/v1/collects/')
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['results'][0]['current_amount'] == '1000.00'
+    assert response.data['results'][0]['donators_count'] == 1
+    assert not any(
+        'SUM(' in query['sql'] or 'COUNT(' in query['sql']
+        for query in queries.captured_queries
+    )
+
+
+def test_collect_list_is_paginated_without_payments(api_client, user):
+    """Лента сборов разбита на страницы и не содержит вложенных платежей."""
+    baker.make('collects.Collect', author=user, _quantity=3)
+
+    response = api_client.get('/api/v1/collects/?page_size=2')
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data['results']) == 2
+    assert 'payments' not in response.data['results'][0]
+    assert response.data['next'] is not None
+
+    response = api_client.get(response.data['next'])
+    assert len(response.data['results']) == 1
+    assert response.data['next'] is None
+
+
+def test_collect_payments_subresource(api_client, collect, user):
+    """Платежи сбора доступны отдельным постраничным ресурсом."""
+    baker.make(
+        'payments.Payment', collect=collect, donator=user, amount=100,
+        _quantity=3
+    )
+
+    response = api_client.get(
+        f'/api/v1/collects/{collect.id}/payments/?page_size=2'
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data['results']) == 2
+    assert response.data['results'][0]['donator_username'] == user.username
+    assert response.data['next'] is not None
+
+
+def test_collect_detail_cache_invalidated_by_payment(
+    api_client, collect, user, locmem_cache,
+    django_capture_on_commit_callbacks
+):
+    """Новый платеж сбрасывает кэш сбора и ленты без полной очистки."""
+    other_collect = baker.make('collects.Collect', author=user)
+    url = f'/api/v1/collects/{collect.id}/'
+    assert api_client.get(url).data['current_amount'] == '0.00'
+    api_client.get(f'/api/v1/collects/{other_collect.id}/')
+    (generation,) = get_versions(COLLECTS_LIST_GENERATION_KEY)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        baker.make(
+            'payments.Payment', collect=collect, donator=user, amount=700
+        )
+
+    response = api_client.get(url)
+    assert response.data['current_amount'] == '700.00'
+    assert get_versions(COLLECTS_LIST_GENERATION_KEY) == [generation + 1]
+
+    with CaptureQueriesContext(connection) as queries:
+        api_client.get(f'/api/v1/collects/{other_collect.id}/')
+    assert len(queries) == 0
+
+
+def test_payment_list_cache_varies_by_token_user(
+    user, another_user, collect, locmem_cache,
+    django_capture_on_commit_callbacks
+):
+    """Кэш списка платежей не смешивает пользователей с токенами."""
+    baker.make('payments.Payment', collect=collect, donator=user, amount=100)
+    baker.make(
+        'payments.Payment', collect=collect, donator=another_user, amount=200
+    )
+    clients = {}
+    for owner in (user, another_user):
+        clients[owner] = APIClient()
+        clients[owner].credentials(
+            HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=owner).key}'
+        )
+
+    before = get_cache_stats().get('payment:list', {})
+    for _ in range(2):
+        for owner, amount in ((user, '100.00'), (another_user, '200.00')):
+            response = clients[owner].get(
+                f'/api/v1/payments/?collect_id={collect.id}'
+            )
+            assert [item['amount'] for item in response.data['results']] == [
+                amount
+            ]
+
+    stats = get_cache_stats()['payment:list']
+    assert stats['misses'] - before.get('misses', 0) == 2
+    assert stats['hits'] - before.get('hits', 0) == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        clients[user].post(
+            '/api/v1/payments/', {'collect': collect.id, 'amount': 50}
+        )
+    response = clients[user].get(f'/api/v1/payments/?collect_id={collect.id}')
+    assert len(response.data['results']) == 2
+
+
+def test_payment_completes_collect_on_target(authenticated_client, collect):
+    """Платеж, достигший целевой суммы, завершает сбор."""
+    response = authenticated_client.post(
+        '/api/v1/payments/',
+        {'collect': collect.id, 'amount': collect.target_amount},
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    collect.refresh_from_db()
+    assert collect.is_completed
+    assert collect.current_amount == collect.target_amount
+
+
+def test_collect_save_keeps_totals(authenticated_client, collect):
+    """
+    Сохранение сбора, загруженного до платежа, не затирает итоги
+    и не открывает завершенный сбор.
+    """
+    stale = Collect.objects.get(pk=collect.pk)
+    response = authenticated_client.post(
+        '/api/v1/payments/',
+        {'collect': collect.id, 'amount': collect.target_amount},
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+    stale.title = 'Новое название'
+    stale.save()
+    response = authenticated_client.patch(
+        f'/api/v1/collects/{collect.pk}/', {'description': 'Описание'}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    collect.refresh_from_db()
+    assert (collect.title, collect.description) == (
+        'Новое название', 'Описание'
+    )
+    assert collect.is_completed
+    assert collect.current_amount == collect.target_amount
+    assert (collect.payments_count, collect.donators_count) == (1, 1)
+    response = authenticated_client.post(
+        '/api/v1/payments/', {'collect': collect.id, 'amount': 1}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_payments_do_not_overshoot_target():
+    """Параллельные платежи не превышают целевую сумму сбора."""
+    author = baker.make(User)
+    donators = baker.make(User, _quantity=30)
+    collect = baker.make(
+        'collects.Collect', author=author, target_amount=1000,
+        end_datetime=timezone.now() + timedelta(days=1),
+    )
+    barrier = threading.Barrier(len(donators))
+
+    def pay(donator):
+        client = APIClient()
+        client.force_authenticate(user=donator)
+        barrier.wait()
+        try:
+            return client.post(
+                '/api/v1/payments/', {'collect': collect.id, 'amount': 100}
+            ).status_code
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=len(donators)) as executor:
+        codes = list(executor.map(pay, donators))
+
+    collect.refresh_from_db()
+    assert codes.count(status.HTTP_201_CREATED) == 10
+    assert codes.count(status.HTTP_400_BAD_REQUEST) == 20
+    assert collect.current_amount == 1000
+    assert collect.payments_count == 10
+    assert collect.donators_count == 10
+    assert collect.is_completed
+    assert collect.payments.count() == 10
+
+
+@pytest.mark.parametrize('queryset_factory', [
+    lambda user, collect: Collect.objects.order_by('-created_at', 'id')[:21],
+    lambda user, collect: Collect.objects.filter(
+        occasion='birthday'
+    ).order_by('-created_at')[:21],
+    lambda user, collect: Collect.objects.filter(
+        is_completed=False, end_datetime__lte=timezone.now()
+    ).order_by('end_datetime'),
+    lambda user, collect: Payment.objects.filter(
+        donator=user
+    ).order_by('-payment_datetime', 'id')[:21],
+    lambda user, collect: Payment.objects.filter(
+        donator=user, collect_id=collect.id
+    ).order_by('-payment_datetime', 'id')[:21],
+    lambda user, collect: collect.payments.order_by(
+        '-payment_datetime', 'id'
+    )[:21],
+    lambda user, collect: collect.donator_entries.order_by(
+        '-amount', 'donator_id'
+    )[:10],
+])
+def test_list_queries_use_index(queryset_factory, user, collect, payment):
+    """Основные запросы списков используют индексы, а не полный перебор."""
+    plan = queryset_factory(user, collect).explain()
+
+    assert 'USING INDEX' in plan or 'USING COVERING INDEX' in plan, plan
+
+
+@pytest.fixture
+def sent_notifications(monkeypatch):
+    """Фикстура, перехватывающая отправку задач уведомлений о платежах."""
+    sent = []
+    monkeypatch.setattr(
+        tasks.send_donation_emails, 'delay', lambda ids: sent.append(ids)
+    )
+    return sent
+
+
+def test_bulk_payments_per_item_results(
+    authenticated_client, collect, completed_collect, user,
+    django_capture_on_commit_callbacks, sent_notifications
+):
+    """Пакетная загрузка создает допустимые платежи и отклоняет остальные."""
+    items = [
+        {'collect': collect.id, 'amount': 4000},
+        {'collect': collect.id, 'amount': 5000, 'hide_amount': True},
+        {'collect': collect.id, 'amount': 2000},
+        {'collect': completed_collect.id, 'amount': 100},
+        {'collect': 999999, 'amount': 100},
+        {'collect': collect.id, 'amount': 'abc'},
+        {'collect': collect.id, 'amount': 0},
+        {'collect': collect.id, 'amount': -500},
+    ]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.post(
+                '/api/v1/payments/bulk/', items, format='json'
+            )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['created'] == 2
+    assert response.data['rejected'] == 6
+    results = response.data['results']
+    assert [result['status'] for result in results] == [
+        'created', 'created', 'rejected', 'rejected', 'rejected', 'rejected',
+        'rejected', 'rejected',
+    ]
+    assert 'amount' in results[2]['errors']
+    assert 'collect' in results[3]['errors']
+    assert 'collect' in results[4]['errors']
+    assert 'amount' in results[5]['errors']
+    assert 'amount' in results[6]['errors']
+    assert 'amount' in results[7]['errors']
+    assert sent_notifications == [[results[0]['id'], results[1]['id']]]
+    assert not any('SUM(' in query['sql'] for query in queries)
+
+    collect.refresh_from_db()
+    assert collect.current_amount == 9000
+    assert collect.payments_count == 2
+    assert collect.donators_count == 1
+    assert Payment.objects.get(pk=results[1]['id']).hide_amount
+
+
+def test_bulk_payments_rejects_non_list(authenticated_client):
+    """Пакетная загрузка ожидает список платежей."""
+    response = authenticated_client.post(
+        '/api/v1/payments/bulk/', {'collect': 1}, format='json'
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_payment_notification_enqueued_on_commit(
+    collect, user, django_capture_on_commit_callbacks, sent_notifications
+):
+    """Уведомление о платеже ставится в очередь только после фиксации."""
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        payment = baker.make(
+            'payments.Payment', collect=collect, donator=user, amount=100
+        )
+    assert sent_notifications == []
+
+    for callback in callbacks:
+        callback()
+    assert sent_notifications == [[payment.id]]
+
+
+def test_flush_donation_notifications_in_batches(
+    collect, user, settings, monkeypatch, django_assert_num_queries
+):
+    """Буфер уведомлений разбирается пачками, один запрос на пачку."""
+    settings.PAYMENT_NOTIFICATIONS_BATCH_SIZE = 2
+    payments = baker.make(
+        'payments.Payment', collect=collect, donator=user, amount=10,
+        _quantity=5
+    )
+    buffer = [payment.id for payment in payments]
+
+    def pop_payment_ids(count):
+        batch = buffer[:count]
+        del buffer[:count]
+        return batch
+
+    monkeypatch.setattr(tasks, 'pop_payment_ids', pop_payment_ids)
+
+    with django_assert_num_queries(3):
+        assert tasks.flush_donation_notifications() == 5
+    assert buffer == []
+
+
+@pytest.fixture
+def admin_client(api_client, db):
+    """Фикстура для API клиента администратора."""
+    api_client.force_authenticate(user=baker.make(User, is_staff=True))
+    return api_client
+
+
+def test_payments_export_streams_csv(admin_client, collect, user):
+    """Выгрузка платежей отдается потоком CSV с фильтром по сбору."""
+    baker.make(
+        'payments.Payment', collect=collect, donator=user, amount=100,
+        _quantity=3
+    )
+    other = baker.make('collects.Collect', author=user)
+    baker.make('payments.Payment', collect=other, donator=user, amount=5)
+
+    response = admin_client.get(
+        f'/api/v1/payments/export/?file_format=csv&collect_id={collect.id}'
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    assert lines[0].startswith('id,collect_id,collect_title')
+    assert len(lines) == 4
+    assert all(',100.00,' in line for line in lines[1:])
+
+
+def test_collects_export_streams_ndjson(admin_client, collect):
+    """Отчет по сборам выгружается в NDJSON."""
+    response = admin_client.get('/api/v1/collects/export/?file_format=ndjson')
+
+    rows = [
+        json.loads(line)
+        for line in b''.join(response.streaming_content).splitlines()
+    ]
+    assert rows == [{
+        **rows[0], 'id': collect.id, 'current_amount': '0.00'
+    }]
+
+
+def test_export_requires_staff(authenticated_client):
+    """Выгрузка доступна только администраторам."""
+    response = authenticated_client.get('/api/v1/payments/export/')
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_export_streams_under_asgi(collect, user, monkeypatch):
+    """
+    Под ASGI выгрузка отдается пачками: первая часть уходит клиенту
+    до того, как прочитаны все строки.
+    """
+    baker.make(
+        'payments.Payment', collect=collect, donator=user, amount=100,
+        _quantity=5
+    )
+    monkeypatch.setattr(exports, 'EXPORT_CHUNK_SIZE', 2)
+    exhausted = []
+
+    def iter_rows(*args, **kwargs):
+        yield from original_iter_rows(*args, **kwargs)
+        exhausted.append(True)
+
+    original_iter_rows = exports.iter_rows
+    monkeypatch.setattr(exports, 'iter_rows', iter_rows)
+    token = Token.objects.create(user=baker.make(User, is_staff=True))
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': '/api/v1/payments/export/',
+        'query_string': b'file_format=csv',
+        'headers': [
+            (b'host', b'testserver'),
+            (b'authorization', f'Token {token.key}'.encode()),
+        ],
+    }
+    chunks = []
+
+    async def receive():
+        if not chunks:
+            chunks.append(None)
+            return {'type': 'http.request', 'body': b''}
+        # Клиент не отключается, пока ответ не отправлен.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message['type'] == 'http.response.body' and message.get('body'):
+            chunks.append((message['body'], bool(exhausted)))
+
+    # Как тестовый клиент Django: соединение с тестовой транзакцией
+    # не закрывается по сигналам начала и конца запроса.
+    signals.request_started.disconnect(close_old_connections)
+    signals.request_finished.disconnect(close_old_connections)
+    try:
+        async_to_sync(ASGIHandler())(scope, receive, send)
+    finally:
+        signals.request_started.connect(close_old_connections)
+        signals.request_finished.connect(close_old_connections)
+
+    body, rows_exhausted = chunks[1]
+    assert body.decode().splitlines()[0].startswith('id,collect_id')
+    assert not rows_exhausted
+    lines = b''.join(chunk for chunk, _ in chunks[1:]).decode().splitlines()
+    assert len(lines) == 6
+
+
+def test_export_payments_command(collect, user, tmp_path):
+    """Команда выгружает платежи в файл NDJSON и CSV."""
+    baker.make(
+        'payments.Payment', collect=collect, donator=user, amount=100,
+        _quantity=2
+    )
+    for file_format in ('ndjson', 'csv'):
+        output = tmp_path / f'payments.{file_format}'
+        stdout = io.StringIO()
+        call_command(
+            'export_payments', '--format', file_format,
+            '--output', str(output), stdout=stdout,
+        )
+        assert 'Выгружено строк: 2 ' in stdout.getvalue()
+
+    rows = [
+        json.loads(line)
+        for line in (tmp_path / 'payments.ndjson').read_text().splitlines()
+    ]
+    assert [row['amount'] for row in rows] == ['100.00', '100.00']
+    assert rows[0]['donator_username'] == user.username
+    assert len((tmp_path / 'payments.csv').read_text().splitlines()) == 3
+
+
+def test_fill_db_creates_consistent_totals(db):
+    """Генератор данных сразу заполняет согласованные итоги сборов."""
+    output = io.StringIO()
+    call_command(
+        'fill_db', '--users', '4', '--collects', '3', '--payments', '6',
+        '--batch-size', '7', '--seed', '42', stdout=output,
+    )
+
+    assert User.objects.count() == 4
+    assert Collect.objects.count() == 12
+    assert Payment.objects.count() == sum(
+        Collect.objects.values_list('payments_count', flat=True)
+    )
+    assert reconcile_totals(repair=False) == []
+    assert OccasionDailyStats.objects.aggregate(
+        total=Sum('payments_count')
+    )['total'] == Payment.objects.count()
+    assert 'строк/с' in output.getvalue()
+
+
+def test_server_timing_header(api_client, collect):
+    """Ответ содержит время обработки и запросы к БД в Server-Timing."""
+    response = api_client.get(f'/api/v1/collects/{collect.id}/')
+
+    timing = response['Server-Timing']
+    assert timing.startswith('app;dur=')
+    assert 'db;dur=' in timing
+    assert 'serializer;dur=' in timing
+    assert 'cache;desc="0 hits, 1 misses"' in timing
+
+
+def test_metrics_endpoint_reports_views(admin_client, collect):
+    """Счетчики по представлениям отдаются в формате Prometheus."""
+    admin_client.get('/api/v1/collects/')
+
+    response = admin_client.get('/api/v1/metrics/')
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'].startswith('text/plain')
+    body = response.content.decode()
+    assert '# TYPE donut_db_queries_total counter' in body
+    assert 'donut_requests_total{view="CollectViewSet.list"}' in body
+
+
+def test_slow_query_logged_with_call_site(
+        api_client, collect, settings, caplog
+):
+    """Запросы дольше порога пишутся в лог с SQL и местом вызова."""
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+
+    with caplog.at_level('WARNING', logger='slow_queries'):
+        api_client.get(f'/api/v1/collects/{collect.id}/payments/')
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(
+        'CollectViewSet.payments' in message
+        and 'collects/views.py' in message
+        and 'SELECT' in message
+        for message in messages
+    )
+
+
+def test_leaderboard_and_stats_follow_payments(
+        api_client, collect, user, another_user
+):
+    """Рейтинг донатеров и статистика поводов следуют за платежами."""
+    baker.make('payments.Payment', collect=collect, donator=user, amount=300)
+    baker.make(
+        'payments.Payment', collect=collect, donator=another_user, amount=500
+    )
+    payment = baker.make(
+        'payments.Payment', collect=collect, donator=another_user, amount=100
+    )
+
+    leaderboard = api_client.get(
+        f'/api/v1/collects/{collect.id}/leaderboard/?limit=1'
+    ).data
+    assert [
+        (row['donator']['id'], row['amount'], row['payments_count'])
+        for row in leaderboard
+    ] == [(another_user.id, '600.00', 2)]
+
+    payment.delete()
+    stats = api_client.get('/api/v1/collects/stats/').data
+    assert stats['occasions'] == [{
+        'occasion': collect.occasion, 'amount': '800.00', 'payments_count': 2
+    }]
+    assert stats['daily'] == [{
+        'day': timezone.localdate().isoformat(),
+        'occasion': collect.occasion,
+        'amount': '800.00',
+        'payments_count': 2,
+    }]
+
+
+def test_rebuild_stats_restores_rollups(collect, user):
+    """Команда rebuild_stats пересчитывает статистику по платежам."""
+    baker.make(
+        'payments.Payment', collect=collect, donator=user, amount=250,
+        _quantity=2
+    )
+    CollectDonator.objects.update(amount=0)
+    OccasionDailyStats.objects.all().delete()
+
+    call_command('rebuild_stats', stdout=io.StringIO())
+
+    assert CollectDonator.objects.get().amount == 500
+    stats = OccasionDailyStats.objects.get()
+    assert (stats.occasion, stats.amount, stats.payments_count) == (
+        collect.occasion, 500, 2
+    )
+
+
+def test_complete_collects_closes_expired_and_funded_in_batches(
+        collect, user, monkeypatch, django_capture_on_commit_callbacks
+):
+    """
+    Периодическая задача закрывает истекшие сборы пачками,
+    а сбор с уменьшенной до собранной суммы целью закрывается
+    при сохранении.
+    """
+    events = []
+    monkeypatch.setattr(
+        collects_tasks.send_collects_completed, 'delay',
+        lambda ids: events.append(sorted(ids)),
+    )
+    expired = baker.make(
+        'collects.Collect', author=user, _quantity=3,
+        end_datetime=timezone.now() - timedelta(hours=1),
+    )
+    funded = baker.make(
+        'collects.Collect', author=user, target_amount=200,
+        end_datetime=timezone.now() + timedelta(days=1),
+    )
+    Collect.objects.filter(pk=funded.pk).update(current_amount=100)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert collects_tasks.complete_collects(batch_size=2) == 3
+    assert [len(batch) for batch in events] == [2, 1]
+    assert not Collect.objects.get(pk=funded.pk).is_completed
+
+    funded.target_amount = 100
+    with django_capture_on_commit_callbacks(execute=True):
+        funded.save()
+    assert funded.is_completed
+    assert events[-1] == [funded.pk]
+
+    assert set(
+        Collect.objects.filter(is_completed=True).values_list('pk', flat=True)
+    ) == {*(item.pk for item in expired), funded.pk}
+    assert not Collect.objects.get(pk=collect.pk).is_completed
+
+
+def test_payment_rejected_for_expired_collect(authenticated_client, user):
+    """Истекший сбор не принимает платежи до закрытия задачей."""
+    expired = baker.make(
+        'collects.Collect', author=user,
+        end_datetime=timezone.now() - timedelta(minutes=1),
+    )
+
+    response = authenticated_client.post(
+        '/api/v1/payments/', {'collect': expired.id, 'amount': 100}
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'collect' in response.data
+
+
+def test_collect_progress_stream(collect, monkeypatch):
+    """SSE-поток отдает состояние сбора и обновления из pub/sub."""
+    async def listen(self):
+        """Вместо подписки Redis сообщения передаются брокеру напрямую."""
+
+    monkeypatch.setattr(ProgressBroker, '_listen', listen)
+    update = {
+        'id': collect.id, 'current_amount': '10000.00',
+        'donators_count': 3, 'payments_count': 4, 'is_completed': True,
+    }
+
+    async def read_stream():
+        response = await AsyncClient().get(
+            f'/api/v1/collects/{collect.id}/progress/'
+        )
+        events = aiter(response.streaming_content)
+        first = await anext(events)
+        get_broker().dispatch(collect.id, json.dumps(update))
+        second = await anext(events)
+        rest = [event async for event in events]
+        return response, first, second, rest
+
+    response, first, second, rest = async_to_sync(read_stream)()
+
+    assert response['Content-Type'] == 'text/event-stream'
+    assert first.startswith(b'event: progress\ndata: ')
+    assert json.loads(first.split(b'data: ')[1])['current_amount'] == '0.00'
+    assert json.loads(second.split(b'data: ')[1]) == update
+    assert rest == []
+
+
+
+def test_async_views_match_sync(
+    api_client, collect, user, another_user, locmem_cache
+):
+    """Асинхронные представления отдают те же данные, что и синхронные."""
+    baker.make(
+        'payments.Payment', collect=collect, donator=user, amount=100,
+        _quantity=3
+    )
+    baker.make(
+        'payments.Payment', collect=collect, donator=another_user, amount=200
+    )
+    token = f'Token {Token.objects.create(user=user).key}'
+    api_client.credentials(HTTP_AUTHORIZATION=token)
+
+    def fetch(url, **kwargs):
+        response = async_to_sync(AsyncClient().get)(url, **kwargs)
+        return response.status_code, response.json()
+
+    # Ссылки next/previous ведут на свои пути, поэтому сравниваются
+    # только страницы.
+    for path, query, field in (
+        ('collects/', '?page_size=1', 'results'),
+        (f'collects/{collect.id}/', '', 'payments'),
+        ('payments/', '?page_size=2', 'results'),
+    ):
+        expected = api_client.get(f'/api/v1/{path}{query}').json()[field]
+        for _ in range(2):
+            status_code, data = fetch(
+                f'/api/v1/async/{path}{query}',
+                headers={'Authorization': token},
+            )
+            assert status_code == status.HTTP_200_OK
+            assert data[field] == expected
+
+    assert get_cache_stats()['payment-async:list']['hits'] >= 1
+    assert fetch('/api/v1/async/payments/')[0] == (
+        status.HTTP_401_UNAUTHORIZED
+    )
+    assert fetch('/api/v1/async/collects/0/')[0] == status.HTTP_404_NOT_FOUND
+
+
+def test_collect_detail_local_cache_tier(
+    admin_client, collect, user, locmem_cache, settings,
+    django_capture_on_commit_callbacks
+):
+    """Горячая карточка сбора отдается из памяти процесса до записи."""
+    settings.LOCAL_CACHE_MAX_ENTRIES = 1
+    local_cache.clear()
+    url = f'/api/v1/collects/{collect.id}/'
+    before = get_cache_stats(LOCAL_TIER).get('collect:retrieve', {})
+    admin_client.get(url)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert admin_client.get(url).data['current_amount'] == '0.00'
+    assert len(queries) == 0
+    stats = get_cache_stats(LOCAL_TIER)['collect:retrieve']
+    assert stats['hits'] - before.get('hits', 0) == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        baker.make(
+            'payments.Payment', collect=collect, donator=user, amount=700
+        )
+    assert admin_client.get(url).data['current_amount'] == '700.00'
+
+    other = baker.make('collects.Collect', author=user)
+    admin_client.get(f'/api/v1/collects/{other.id}/')
+    assert len(local_cache) == 1
+
+    metrics = admin_client.get('/api/v1/metrics/').content.decode()
+    assert (
+        'donut_response_cache_hit_ratio{cache="collect:retrieve",'
+        'tier="local"}'
+    ) in metrics
+
+
+def test_conditional_get_returns_not_modified(
+    authenticated_client, collect, user, locmem_cache,
+    django_capture_on_commit_callbacks
+):
+    """Актуальная копия клиента подтверждается 304 без запросов к БД."""
+    url = f'/api/v1/collects/{collect.id}/'
+    response = authenticated_client.get(url)
+    etag = response['ETag']
+
+    with CaptureQueriesContext(connection) as queries:
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response['ETag'] == etag
+    assert len(queries) == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        authenticated_client.post(
+            '/api/v1/payments/', {'collect': collect.id, 'amount': 50}
+        )
+    response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != etag
+
+    # If-Modified-Since с точностью до секунды не подтверждает копию:
+    # запись в ту же секунду осталась бы незамеченной.
+    response = authenticated_client.get('/api/v1/payments/')
+    with django_capture_on_commit_callbacks(execute=True):
+        authenticated_client.post(
+            '/api/v1/payments/', {'collect': collect.id, 'amount': 50}
+        )
+    response = authenticated_client.get(
+        '/api/v1/payments/',
+        HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data['results']) == 2
+    response = authenticated_client.get(
+        '/api/v1/payments/', HTTP_IF_NONE_MATCH=response['ETag']
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_projections_render_same_bytes_as_serializers(user, another_user):
+    """Проекции values() и FastJSONRenderer не меняют JSON ответов."""
+    collect = baker.make(
+        'collects.Collect',
+        author=user,
+        title='Сбор "на\u2028всё"',
+        target_amount=None,
+        cover_image='collect_covers/cover.png',
+    )
+    baker.make(
+        'payments.Payment', collect=collect, donator=another_user,
+        amount=Decimal('10.5'), _quantity=2
+    )
+    collect.refresh_from_db()
+    request = APIRequestFactory().get('/')
+    context = {'request': request}
+    payments = Payment.objects.filter(collect=collect)
+    row = Collect.objects.values(*COLLECT_VALUES).get(pk=collect.pk)
+
+    for data, expected in (
+        (
+            collect_items([row], request),
+            CollectListSerializer([collect], many=True, context=context).data,
+        ),
+        (
+            collect_detail(
+                row, payments.values(*PAYMENT_SHORT_VALUES), request
+            ),
+            CollectSerializer(collect, context=context).data,
+        ),
+        (
+            payment_items(payments.values(*PAYMENT_VALUES)),
+            PaymentSerializer(payments, many=True).data,
+        ),
+    ):
+        assert FastJSONRenderer().render(data) == (
+            JSONRenderer().render(expected)
+        )
+
+    fallback = {'amount': Decimal('1.50'), 'at': timezone.now()}
+    assert FastJSONRenderer().render(fallback) == (
+        JSONRenderer().render(fallback)
+    )
+
+
+def test_archive_payments_freezes_totals(
+        authenticated_client, collect, user, another_user,
+        django_capture_on_commit_callbacks,
+):
+    """
+    Платежи давно завершенного сбора переносятся в архив: итоги сбора
+    не меняются, а архив доступен по API.
+    """
+    baker.make('payments.Payment', collect=collect, donator=user, amount=1000)
+    baker.make(
+        'payments.Payment', collect=collect, donator=another_user, amount=300
+    )
+    moved = set(
+        Payment.objects.filter(collect=collect).values_list(
+            'id', 'donator_id', 'amount', 'payment_datetime', 'hide_amount'
+        )
+    )
+    active = baker.make(
+        'collects.Collect', author=user,
+        end_datetime=timezone.now() + timedelta(days=1),
+    )
+    baker.make('payments.Payment', collect=active, donator=user, amount=50)
+    Collect.objects.filter(pk=collect.pk).update(
+        is_completed=True, end_datetime=timezone.now() - timedelta(days=40)
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command('archive_payments', '--days', '30')
+
+    collect.refresh_from_db()
+    assert collect.payments_archived_at is not None
+    assert (collect.current_amount, collect.payments_count) == (1300, 2)
+    assert collect.donators_count == 2
+    assert not Payment.objects.filter(collect=collect).exists()
+    assert set(
+        ArchivedPayment.objects.filter(
+            collect=collect, archived_at=collect.payments_archived_at
+        ).values_list(
+            'id', 'donator_id', 'amount', 'payment_datetime', 'hide_amount'
+        )
+    ) == moved
+    assert Payment.objects.filter(collect=active).count() == 1
+    assert reconcile_totals(repair=False) == []
+
+    response = authenticated_client.get('/api/v1/payments/')
+    assert [item['collect'] for item in response.data['results']] == [
+        active.pk
+    ]
+    response = authenticated_client.get('/api/v1/payments/?archived=true')
+    assert [item['amount'] for item in response.data['results']] == [
+        '1000.00'
+    ]
+    response = authenticated_client.get(
+        f'/api/v1/collects/{collect.pk}/payments/'
+    )
+    assert len(response.data['results']) == 2
+    response = authenticated_client.get(f'/api/v1/collects/{collect.pk}/')
+    assert len(response.data['payments']) == 2
+
+    authenticated_client.force_authenticate(
+        user=baker.make(User, is_staff=True)
+    )
+    for query, expected in (
+        (f'collect_id={collect.pk}', {'1000.00', '300.00'}),
+        ('archived=true', {'1000.00', '300.00'}),
+        ('', {'50.00'}),
+    ):
+        response = authenticated_client.get(
+            f'/api/v1/payments/export/?file_format=ndjson&{query}'
+        )
+        assert {
+            json.loads(line)['amount']
+            for line in b''.join(response.streaming_content).splitlines()
+        } == expected
+
+
+def test_admin_changelists_scale(
+        client, collect, user, monkeypatch, settings
+):
+    """
+    Списки админки не делают запросов на строку и не считают COUNT(*)
+    большой таблицы; формы платежа не выводят все сборы и донатеров.
+    """
+    client.force_login(baker.make(User, is_staff=True, is_superuser=True))
+    baker.make(
+        'payments.Payment', collect=collect, donator=user, amount=10,
+        _quantity=3
+    )
+
+    def changelist_queries(url):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        return len(queries)
+
+    payments_queries = changelist_queries('/admin/payments/payment/')
+    collects_queries = changelist_queries('/admin/collects/collect/')
+    baker.make(
+        'payments.Payment', collect=collect, donator=user, amount=10,
+        _quantity=5
+    )
+    baker.make('collects.Collect', author=user, _quantity=3)
+    assert changelist_queries('/admin/payments/payment/') == payments_queries
+    assert changelist_queries('/admin/collects/collect/') == collects_queries
+
+    monkeypatch.setattr(config_admin, 'estimated_count', lambda qs: 5000000)
+    settings.ADMIN_ESTIMATED_COUNT_THRESHOLD = 1000
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/admin/payments/payment/')
+    assert response.context['cl'].result_count == 5000000
+    assert not any(
+        'COUNT(' in query['sql'] for query in queries.captured_queries
+    )
+
+    response = client.get('/admin/payments/payment/add/')
+    assert 'admin-autocomplete' in response.content.decode()
+    assert f'>{collect.title}<' not in response.content.decode()
+
+
+def test_collect_search_ranked_and_paginated(api_client, user):
+    """Поиск по названию и описанию сборов ранжирует и делит на страницы."""
+    title_match = baker.make(
+        'collects.Collect', author=user, title='Лечение Барсика',
+        description='Операция для кота', occasion='medicine',
+    )
+    description_match = baker.make(
+        'collects.Collect', author=user, title='Помощь приюту',
+        description='Корм, лечение и прививки', occasion='charity',
+    )
+    baker.make(
+        'collects.Collect', author=user, title='День рождения',
+        description='Подарок коллеге',
+    )
+
+    response = api_client.get('/api/v1/collects/', {'search': 'лечение'})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['count'] == 2
+    assert [item['id'] for item in response.data['results']] == [
+        title_match.pk, description_match.pk
+    ]
+
+    response = api_client.get(
+        '/api/v1/collects/', {'search': 'лечение', 'page_size': 1}
+    )
+    assert len(response.data['results']) == 1
+    assert response.data['next'] is not None
+
+    # Фильтры ленты применяются к результатам поиска, а асинхронная
+    # лента ищет так же, как синхронная.
+    for params, ids in (
+        ({'search': 'лечение'}, [title_match.pk, description_match.pk]),
+        ({'search': 'корм', 'page_size': 1}, [description_match.pk]),
+        ({'search': 'лечение', 'occasion': 'charity'},
+         [description_match.pk]),
+        ({'search': 'лечение', 'author': user.pk, 'is_completed': 'true'},
+         []),
+    ):
+        expected = api_client.get('/api/v1/collects/', params).json()
+        assert [item['id'] for item in expected['results']] == ids
+        response = async_to_sync(AsyncClient().get)(
+            '/api/v1/async/collects/', params
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['results'] == expected['results']
+        assert response.json()['count'] == expected['count']
+
+    params = {'search': 'лечение', 'ordering': 'created_at'}
+    response = api_client.get('/api/v1/collects/', params)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = async_to_sync(AsyncClient().get)(
+        '/api/v1/async/collects/', params
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    # Индекс обновляется при сохранении и удалении сбора.
+    description_match.description = 'Корм и прививки'
+    description_match.save()
+    title_match.delete()
+    response = api_client.get('/api/v1/collects/', {'search': 'лечение'})
+    assert response.data['count'] == 0
+
+    response = api_client.get('/api/v1/collects/', {'search': '"OR * ('})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['count'] == 0
+
+
+FEED_FILTER_VALUES = {
+    'occasion': [{'occasion': 'birthday'}],
+    'author': [{'author': 1}],
+    'is_completed': [{'is_completed': False}, {'is_completed': True}],
+    'end_datetime': [{
+        'end_after': timezone.now(),
+        'end_before': timezone.now() + timedelta(days=7),
+    }],
+}
+
+
+def _feed_params():
+    """Все допустимые сочетания фильтров и сортировок ленты."""
+    for ordering in FEED_ORDERINGS:
+        for combination in FEED_FILTERS[ordering.lstrip('-')]:
+            variants = [{'ordering': ordering}]
+            for group in sorted(combination):
+                variants = [
+                    {**variant, **values}
+                    for variant in variants
+                    for values in FEED_FILTER_VALUES[group]
+                    if ordering.lstrip('-') not in ACTIVE_ONLY_ORDERINGS
+                    or values.get('is_completed') is not True
+                ]
+            yield from variants
+
+
+def _feed_params_id(params):
+    return '&'.join(
+        f'{name}={value}' if name in ('ordering', 'is_completed') else name
+        for name, value in params.items()
+    )
+
+
+@pytest.mark.parametrize(
+    'params', list(_feed_params()), ids=_feed_params_id
+)
+def test_feed_filters_use_index(params, collect):
+    """
+    Каждое разрешенное сочетание фильтров и сортировки ленты читает
+    сборы по индексу, без полного перебора и сортировки в памяти.
+    """
+    queryset, ordering = filter_feed(
+        Collect.objects.values(*COLLECT_VALUES), params
+    )
+    plan = queryset.order_by(*ordering)[:21].explain()
+
+    collect_steps = [
+        line for line in plan.splitlines() if 'collects_collect' in line
+    ]
+    assert collect_steps, plan
+    assert all('USING' in line for line in collect_steps), plan
+    assert 'TEMP B-TREE' not in plan, plan
+
+
+def test_collect_feed_filters_and_ordering(api_client, user, another_user):
+    """Лента фильтруется и сортируется на сервере, с курсором."""
+    now = timezone.now()
+    near_goal = baker.make(
+        'collects.Collect', author=user, occasion='birthday',
+        target_amount=1000, end_datetime=now + timedelta(days=2),
+    )
+    far_from_goal = baker.make(
+        'collects.Collect', author=another_user, occasion='wedding',
+        target_amount=1000, end_datetime=now + timedelta(days=20),
+    )
+    Collect.objects.filter(pk=near_goal.pk).update(current_amount=900)
+    Collect.objects.filter(pk=far_from_goal.pk).update(current_amount=100)
+
+    def ids(**params):
+        response = api_client.get('/api/v1/collects/', params)
+        assert response.status_code == status.HTTP_200_OK, response.data
+        result = [item['id'] for item in response.data['results']]
+        # Асинхронная лента фильтрует и сортирует так же.
+        response = async_to_sync(AsyncClient().get)(
+            '/api/v1/async/collects/', params
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['id'] for item in response.json()['results']] == result
+        return result
+
+    assert ids(occasion='wedding') == [far_from_goal.pk]
+    assert ids(author=user.pk) == [near_goal.pk]
+    assert ids(
+        ordering='end_datetime', is_completed='false',
+        end_before=now + timedelta(days=7),
+    ) == [near_goal.pk]
+    assert ids(ordering='-progress', is_completed='false') == [
+        near_goal.pk, far_from_goal.pk
+    ]
+    assert ids(
+        ordering='-progress', is_completed='false', page_size=1
+    ) == [near_goal.pk]
+
+    response = api_client.get('/api/v1/collects/', {
+        'ordering': '-progress', 'is_completed': 'false', 'page_size': 1,
+    })
+    response = api_client.get(response.data['next'])
+    assert [item['id'] for item in response.data['results']] == [
+        far_from_goal.pk
+    ]
+
+    # Сочетания без подходящего индекса отклоняются.
+    for params in (
+        {'ordering': '-progress'},
+        {'ordering': 'end_datetime'},
+        {
+            'ordering': 'end_datetime', 'is_completed': 'false',
+            'author': user.pk,
+        },
+        {'occasion': 'wedding', 'is_completed': 'false'},
+    ):
+        response = api_client.get('/api/v1/collects/', params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        response = async_to_sync(AsyncClient().get)(
+            '/api/v1/async/collects/', params
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_cover_variants_built_outside_upload(
+        authenticated_client, api_client, monkeypatch, settings, tmp_path,
+        django_capture_on_commit_callbacks,
+):
+    """
+    Загрузка обложки только ставит задачу; задача строит варианты
+    без метаданных, и список сборов ссылается на уменьшенную копию.
+    """
+    settings.MEDIA_ROOT = tmp_path
+    queued = []
+    monkeypatch.setattr(
+        collects_tasks.process_cover_image, 'delay', queued.append
+    )
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera'
+    cover = io.BytesIO()
+    Image.new('RGB', (2000, 1000), 'red').save(cover, 'JPEG', exif=exif)
+    cover.name = 'cover.jpg'
+    cover.seek(0)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = authenticated_client.post('/api/v1/collects/', {
+            'title': 'Обложка',
+            'description': 'Сбор с обложкой',
+            'occasion': 'birthday',
+            'end_datetime': '2028-12-31T23:59:59Z',
+            'cover_image': cover,
+        }, format='multipart')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data['cover_variants'] is None
+    collect_id = response.data['id']
+    assert queued == [collect_id]
+
+    assert process_cover(collect_id)
+    assert not process_cover(collect_id)
+    variants = Collect.objects.get(pk=collect_id).cover_variants['files']
+    assert (variants['thumbnail']['width'],
+            variants['thumbnail']['height']) == (320, 160)
+    assert variants['medium_webp']['width'] == 960
+    for variant in variants.values():
+        with Image.open(tmp_path / variant['name']) as image:
+            assert not image.getexif()
+            assert image.size == (variant['width'], variant['height'])
+
+    response = api_client.get('/api/v1/collects/')
+    item = response.data['results'][0]
+    assert item['cover_variants']['thumbnail']['url'].endswith(
+        variants['thumbnail']['name']
+    )
+
+    # Замена обложки сбрасывает варианты до следующей обработки.
+    collect = Collect.objects.get(pk=collect_id)
+    collect.cover_image = 'collect_covers/other.jpg'
+    with django_capture_on_commit_callbacks(execute=True):
+        collect.save()
+    assert queued == [collect_id, collect_id]
+    assert CollectSerializer(collect).data['cover_variants'] is None
+
+
+def test_cached_token_auth_revoked_immediately(
+        api_client, client, user, locmem_cache, settings,
+        django_capture_on_commit_callbacks,
+):
+    """
+    Аутентификация по токену и сессии в Redis не обращается к БД,
+    а удаление токена и деактивация пользователя действуют сразу.
+    """
+    token = Token.objects.create(user=user)
+    api_client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def auth_queries(
+            test_client, url='/api/v1/collects/',
+            tables=('authtoken_token', 'users_customuser'),
+    ):
+        with CaptureQueriesContext(connection) as queries:
+            response = test_client.get(url)
+        return response.status_code, [
+            query['sql'] for query in queries.captured_queries
+            if any(f'FROM "{table}"' in query['sql'] for table in tables)
+        ]
+
+    assert auth_queries(api_client)[0] == status.HTTP_200_OK
+    assert auth_queries(api_client) == (status.HTTP_200_OK, [])
+    # В кэше только поля для проверок доступа, без хэша пароля.
+    assert dict(
+        zip(AUTH_USER_FIELDS, cache.get(user_cache_key(user.pk)))
+    ) == {
+        'id': user.pk, 'is_active': True, 'is_staff': False,
+        'is_superuser': False,
+    }
+    key = token.key
+    response = async_to_sync(AsyncClient().get)(
+        '/api/v1/async/payments/', headers={'Authorization': f'Token {key}'},
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    with django_capture_on_commit_callbacks(execute=True):
+        token.delete()
+    assert auth_queries(api_client)[0] == status.HTTP_401_UNAUTHORIZED
+    response = async_to_sync(AsyncClient().get)(
+        '/api/v1/async/payments/', headers={'Authorization': f'Token {key}'},
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    token = Token.objects.create(user=user)
+    api_client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    assert auth_queries(api_client)[0] == status.HTTP_200_OK
+    user.is_active = False
+    with django_capture_on_commit_callbacks(execute=True):
+        with CaptureQueriesContext(connection) as queries:
+            user.save()
+    # Сброс по идентификатору пользователя, без поиска его токенов.
+    assert len(queries) == 1
+    assert auth_queries(api_client)[0] == status.HTTP_401_UNAUTHORIZED
+
+    user.is_active = True
+    user.save()
+    settings.SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
+    client.force_login(user)
+    assert auth_queries(
+        client, '/api/v1/payments/', tables=('django_session',)
+    ) == (status.HTTP_200_OK, [])
@@ -7,3 +7,5 @@ from users.models import CustomUser
 class CustomUserAdmin(admin.ModelAdmin):
     list_display = ('username', 'email', 'first_name', 'last_name', 'is_staff')
     list_filter = ('is_staff', 'is_superuser', 'is_active')
+    # Нужен для autocomplete донатеров и авторов в админке.
+    search_fields = ('username', 'email', 'first_name', 'last_name')
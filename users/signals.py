@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from config.authentication import invalidate_tokens, invalidate_user
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token)
+def handle_token_delete(sender, instance, **kwargs):
+    """Отзывает удаленный токен в кэше аутентификации."""
+    # После удаления delete() обнуляет первичный ключ экземпляра.
+    keys = [instance.key]
+    transaction.on_commit(lambda: invalidate_tokens(keys))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def handle_user_change(sender, instance, update_fields=None, **kwargs):
+    """
+    Сбрасывает кэш аутентификации измененного пользователя.
+    Вход по сессии меняет только last_login: кэш не сбрасывается.
+    """
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_user(user_id))